@@ -11,7 +11,6 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import QTimer, pyqtSignal, QObject, QThread, Qt
 from PyQt5.QtGui import QFont, QPalette, QColor, QTextCursor
 from gptoss_client import chat
-from settings_window import SettingsWindow 
 from simple_server_manager import SimpleServerManager
 
 
@@ -1243,6 +1242,9 @@ class ADHDApp(QWidget):
 
     # ─── adhd_app_gui.py ────────────────────────────────────────────────
     def start_diagnosis_phase(self):
+        # Imported here: settings_window pulls in cv2, audio and (via diagnosis_window) TTS/torch,
+        # none of which the first window needs
+        from settings_window import SettingsWindow
         self.settings_window = SettingsWindow()
         self.settings_window.show()
     
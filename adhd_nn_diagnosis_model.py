@@ -1,55 +1,139 @@
 import torch
 import torch.nn as nn
-from transformers import BertTokenizer, BertModel
-from torch.utils.data import Dataset, DataLoader
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+from transformers import BertConfig, BertTokenizerFast, BertModel
+from torch.utils.data import Dataset, DataLoader, Sampler
+from sklearn.metrics import roc_auc_score
+import numpy as np
 import pandas as pd
+import contextlib
+import json
+import random
+import threading
+import time
+import sys
 import os
 
+from atomic_write import atomic_file
+from transcript_ingest import feature_arrays
+
 # Config
 MAX_LEN = 128
 BATCH_SIZE = 16
 EPOCHS = 4
 LEARNING_RATE = 2e-5
+DROPOUT = 0.3
 PRETRAINED_MODEL = 'bert-base-uncased'
 
-# Tokenizer
-tokenizer = BertTokenizer.from_pretrained(PRETRAINED_MODEL)
+# Tokenizer (loaded on first use so importing this module stays cheap)
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+def get_tokenizer():
+    global _tokenizer
+    if _tokenizer is None:
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                _tokenizer = BertTokenizerFast.from_pretrained(PRETRAINED_MODEL)
+    return _tokenizer
 
 # Dataset
 class ADHDInterviewDataset(Dataset):
     def __init__(self, dataframe):
-        self.data = dataframe
+        # Columns are converted once here, so __getitem__ only indexes arrays
+        self.texts = dataframe['response'].astype(str).tolist()
+        features = feature_arrays(dataframe)
+        self.ages = features['age'][:, None]
+        self.sexes = features['sex'][:, None]
+        self.labels = features['label'][:, None]
 
     def __len__(self):
-        return len(self.data)
+        return len(self.texts)
 
     def __getitem__(self, index):
-        item = self.data.iloc[index]
-        encoding = tokenizer(
-            item['response'],
+        # No padding here: collate_batch pads each batch to its longest sequence
+        encoding = get_tokenizer()(
+            self.texts[index],
             truncation=True,
-            padding='max_length',
             max_length=MAX_LEN,
             return_tensors='pt'
         )
-        age = torch.tensor([item['age'] / 100.0], dtype=torch.float)
-        sex_str = str(item['sex']).lower()
-        sex = torch.tensor([1.0 if sex_str == 'male' else 0.0], dtype=torch.float)
-        label = torch.tensor([item['label']], dtype=torch.float)
         return {
             'input_ids': encoding['input_ids'].squeeze(0),
             'attention_mask': encoding['attention_mask'].squeeze(0),
-            'age': age,
-            'sex': sex,
-            'label': label
+            'age': torch.from_numpy(self.ages[index]),
+            'sex': torch.from_numpy(self.sexes[index]),
+            'label': torch.from_numpy(self.labels[index])
         }
 
+    def lengths(self):
+        """Token count per row (after truncation), used for length bucketing."""
+        return token_lengths(self.texts)
+
+def token_lengths(texts, max_len=MAX_LEN):
+    encoded = get_tokenizer()([str(t) for t in texts], truncation=True, max_length=max_len)
+    return [len(ids) for ids in encoded['input_ids']]
+
+def collate_batch(batch):
+    """Pad input_ids/attention_mask to the longest sequence in the batch instead of MAX_LEN."""
+    longest = max(item['input_ids'].size(0) for item in batch)
+    input_ids = torch.full((len(batch), longest), get_tokenizer().pad_token_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(batch), longest), dtype=torch.long)
+    for i, item in enumerate(batch):
+        n = item['input_ids'].size(0)
+        input_ids[i, :n] = item['input_ids']
+        attention_mask[i, :n] = item['attention_mask']
+    return {
+        'input_ids': input_ids,
+        'attention_mask': attention_mask,
+        'age': torch.stack([item['age'] for item in batch]),
+        'sex': torch.stack([item['sex'] for item in batch]),
+        'label': torch.stack([item['label'] for item in batch])
+    }
+
+class LengthBucketSampler(Sampler):
+    """Batch sampler grouping rows of similar token length (same seed on every rank under DDP)."""
+    def __init__(self, lengths, batch_size, shuffle=True, pool_factor=50, seed=None, num_replicas=1, rank=0):
+        self.lengths = list(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.pool_factor = pool_factor
+        self.rng = random.Random(seed)
+        self.num_replicas = num_replicas
+        self.rank = rank
+
+    def __iter__(self):
+        indices = list(range(len(self.lengths)))
+        if self.shuffle:
+            self.rng.shuffle(indices)
+        pool_size = self.batch_size * self.pool_factor
+        batches = []
+        for start in range(0, len(indices), pool_size):
+            pool = sorted(indices[start:start + pool_size], key=lambda i: self.lengths[i])
+            batches.extend(pool[i:i + self.batch_size] for i in range(0, len(pool), self.batch_size))
+        if self.shuffle:
+            self.rng.shuffle(batches)
+        if self.num_replicas > 1:
+            # Every rank must run the same number of steps, so leftover batches are dropped
+            usable = len(batches) - len(batches) % self.num_replicas
+            batches = batches[self.rank:usable:self.num_replicas]
+        return iter(batches)
+
+    def __len__(self):
+        batches = (len(self.lengths) + self.batch_size - 1) // self.batch_size
+        return batches // self.num_replicas
+
 class ADHDClassifier(nn.Module):
-    def __init__(self):
+    def __init__(self, gradient_checkpointing=False, bert_config=None, dropout=DROPOUT):
         super(ADHDClassifier, self).__init__()
-        self.bert = BertModel.from_pretrained(PRETRAINED_MODEL)
-        self.dropout = nn.Dropout(0.3)
+        if bert_config is not None:
+            # Randomly initialised encoder of a custom size (e.g. a distilled student)
+            self.bert = BertModel(bert_config)
+        else:
+            self.bert = BertModel.from_pretrained(PRETRAINED_MODEL)
+        if gradient_checkpointing:
+            # Recompute encoder activations in backward instead of keeping all 12 layers' worth in memory
+            self.bert.gradient_checkpointing_enable(gradient_checkpointing_kwargs={"use_reentrant": False})
+        self.dropout = nn.Dropout(dropout)
         self.fc = nn.Linear(self.bert.config.hidden_size + 2, 1)
 
     def forward(self, input_ids, attention_mask, age, sex):
@@ -59,14 +143,122 @@ class ADHDClassifier(nn.Module):
         x = self.dropout(concat)
         return self.fc(x)
 
-def train_model(model, train_loader, val_loader, epochs=EPOCHS):
+class EarlyExitClassifier(nn.Module):
+    """ADHDClassifier that stops each row at the first intermediate exit confident enough."""
+    def __init__(self, base, exit_layers=(3, 6, 9), exit_threshold=0.9, head_size=128):
+        super(EarlyExitClassifier, self).__init__()
+        self.base = base
+        self.exit_layers = list(exit_layers)
+        self.exit_threshold = exit_threshold
+        hidden = base.bert.config.hidden_size
+        self.exits = nn.ModuleList(
+            nn.ModuleDict({"dense": nn.Linear(hidden, head_size), "fc": nn.Linear(head_size + 2, 1)})
+            for _ in self.exit_layers
+        )
+        self.last_layers_used = None
+
+    def exit_logits(self, i, hidden_states, age, sex):
+        pooled = torch.tanh(self.exits[i]["dense"](hidden_states[:, 0]))
+        return self.exits[i]["fc"](torch.cat((pooled, age, sex), dim=1))
+
+    def all_exit_logits(self, input_ids, attention_mask, age, sex):
+        """Logits of every exit head plus the final head, all layers run (used for training and reports)."""
+        outputs = self.base.bert(input_ids=input_ids, attention_mask=attention_mask, output_hidden_states=True)
+        logits = [self.exit_logits(i, outputs.hidden_states[layer], age, sex) for i, layer in enumerate(self.exit_layers)]
+        final = self.base.fc(self.base.dropout(torch.cat((outputs.pooler_output, age, sex), dim=1)))
+        return logits + [final]
+
+    def forward(self, input_ids, attention_mask, age, sex):
+        bert = self.base.bert
+        hidden = bert.embeddings(input_ids=input_ids)
+        extended_mask = bert.get_extended_attention_mask(attention_mask, input_ids.shape)
+        result = torch.zeros((input_ids.size(0), 1), device=input_ids.device)
+        done = torch.zeros(input_ids.size(0), dtype=torch.bool, device=input_ids.device)
+        layers_used = torch.full((input_ids.size(0),), len(bert.encoder.layer), device=input_ids.device)
+        exits = dict(zip(self.exit_layers, range(len(self.exit_layers))))
+
+        for depth, layer in enumerate(bert.encoder.layer, start=1):
+            out = layer(hidden, attention_mask=extended_mask)
+            hidden = out[0] if isinstance(out, tuple) else out
+            if depth in exits:
+                logits = self.exit_logits(exits[depth], hidden, age, sex)
+                prob = torch.sigmoid(logits.view(-1))
+                confident = ~done & (torch.maximum(prob, 1 - prob) >= self.exit_threshold)
+                result[confident] = logits[confident]
+                layers_used[confident] = depth
+                done |= confident
+                if bool(done.all()):
+                    break
+        else:
+            final = self.base.fc(self.base.dropout(torch.cat((bert.pooler(hidden), age, sex), dim=1)))
+            result[~done] = final[~done]
+        self.last_layers_used = layers_used
+        return result
+
+def peak_memory_mb(device):
+    """Peak memory so far: allocator peak on CUDA, process peak RSS on CPU."""
+    if device.type == "cuda":
+        return torch.cuda.max_memory_allocated(device) / (1024 * 1024)
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil  # Windows: no resource module, but the working-set peak is tracked
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+class PeakMemoryMonitor:
+    """Peak memory between start() and stop(): allocator peak on CUDA, sampled RSS on CPU."""
+    def __init__(self, device, interval=0.05):
+        self.device = device
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        import psutil
+        process = psutil.Process()
+        while True:
+            self.peak = max(self.peak, process.memory_info().rss)
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        self.peak = 0
+        if self.device.type == "cuda":
+            torch.cuda.reset_peak_memory_stats(self.device)
+        else:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Peak in MB since start()."""
+        if self.device.type == "cuda":
+            return torch.cuda.max_memory_allocated(self.device) / (1024 * 1024)
+        self._stop.set()
+        self._thread.join()
+        return self.peak / (1024 * 1024)
+
+def autocast_context(device, precision="fp32"):
+    """bf16 autocast for forward passes; weights and optimizer state stay fp32."""
+    if precision == "bf16":
+        return torch.autocast(device_type=device.type, dtype=torch.bfloat16)
+    return contextlib.nullcontext()
+
+def train_model(model, train_loader, val_loader, epochs=EPOCHS, precision="fp32"):
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     model.to(device)
     optimizer = torch.optim.AdamW(model.parameters(), lr=LEARNING_RATE)
     criterion = nn.BCEWithLogitsLoss()
+    epoch_seconds, metrics = [], {}
 
     for epoch in range(epochs):
         model.train()
+        start = time.perf_counter()
         for batch in train_loader:
             input_ids = batch['input_ids'].to(device)
             attention_mask = batch['attention_mask'].to(device)
@@ -74,21 +266,49 @@ def train_model(model, train_loader, val_loader, epochs=EPOCHS):
             sex = batch['sex'].to(device)
             labels = batch['label'].to(device)
 
-            outputs = model(input_ids, attention_mask, age, sex).squeeze()
-            loss = criterion(outputs, labels)
+            with autocast_context(device, precision):
+                outputs = model(input_ids, attention_mask, age, sex).view(-1)
+                loss = criterion(outputs.float(), labels.view(-1))
             optimizer.zero_grad()
             loss.backward()
             optimizer.step()
+        epoch_seconds.append(time.perf_counter() - start)
+
+        print(f"Epoch {epoch+1}/{epochs} complete. Loss: {loss.item():.4f} | {epoch_seconds[-1]:.1f}s ({precision})")
+        metrics = evaluate_model(model, val_loader, precision)
+
+    return {"precision": precision, "epoch_seconds": epoch_seconds, "metrics": metrics}
+
+def threshold_sweep(probs, labels, thresholds):
+    """Precision/recall/F1/accuracy at every threshold from one sort (prediction is prob > threshold)."""
+    probs, order = probs.sort()
+    labels = labels[order].double()
+    thresholds = thresholds.to(probs)
+    positives_below = torch.cat([labels.new_zeros(1), labels.cumsum(0)])
+    n, total_pos = labels.numel(), labels.sum()
 
-        print(f"Epoch {epoch+1}/{epochs} complete. Loss: {loss.item():.4f}")
-        evaluate_model(model, val_loader)
+    cut = torch.searchsorted(probs, thresholds, right=True)  # rows with prob > t start at cut
+    tp = total_pos - positives_below[cut]
+    predicted = (n - cut).double()
+    fp = predicted - tp
+    tn = (n - total_pos) - fp
+    precision = torch.where(predicted > 0, tp / predicted.clamp(min=1), torch.zeros_like(tp))
+    recall = tp / total_pos.clamp(min=1)
+    f1 = torch.where(precision + recall > 0, 2 * precision * recall / (precision + recall).clamp(min=1e-12),
+                     torch.zeros_like(tp))
+    return {"threshold": thresholds, "precision": precision, "recall": recall, "f1": f1,
+            "accuracy": (tp + tn) / max(n, 1)}
 
-def evaluate_model(model, loader):
+DEFAULT_THRESHOLDS = [round(0.05 * i, 2) for i in range(1, 20)]
+
+def evaluate_model(model, loader, precision="fp32", thresholds=DEFAULT_THRESHOLDS):
+    """Validation metrics at 0.5, ROC AUC and a per-threshold table under metrics["thresholds"]."""
     model.eval()
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    all_preds, all_labels = [], []
+    all_logits, all_labels = [], []
 
-    with torch.no_grad():
+    start = time.perf_counter()
+    with torch.no_grad(), autocast_context(device, precision):
         for batch in loader:
             input_ids = batch['input_ids'].to(device)
             attention_mask = batch['attention_mask'].to(device)
@@ -96,23 +316,236 @@ def evaluate_model(model, loader):
             sex = batch['sex'].to(device)
             labels = batch['label'].to(device)
 
-            logits = model(input_ids, attention_mask, age, sex).squeeze()
-            preds = (torch.sigmoid(logits) > 0.5).float()
+            all_logits.append(model(input_ids, attention_mask, age, sex).view(-1).float())
+            all_labels.append(labels.view(-1).float())
+
+    probs = torch.sigmoid(torch.cat(all_logits))
+    labels = torch.cat(all_labels)
+    grid = torch.tensor(sorted(set(thresholds) | {0.5}), dtype=torch.float64)
+    table = {name: values.cpu() for name, values in threshold_sweep(probs.double(), labels, grid).items()}
+    probs, labels = probs.cpu().numpy(), labels.cpu().numpy()
+    samples_per_s = len(labels) / (time.perf_counter() - start)
 
-            all_preds.extend(preds.cpu().numpy())
-            all_labels.extend(labels.cpu().numpy())
+    half = int((table["threshold"] == 0.5).nonzero()[0])
+    acc, prec, rec, f1 = (float(table[k][half]) for k in ("accuracy", "precision", "recall", "f1"))
+    roc = roc_auc_score(labels, probs) if 0 < labels.sum() < len(labels) else float("nan")
+    print(f"Val Accuracy: {acc:.4f} | Precision: {prec:.4f} | Recall: {rec:.4f} | F1: {f1:.4f} | ROC AUC: {roc:.4f}"
+          f" | {samples_per_s:.1f} samples/s")
+    rows = [dict(zip(table, values)) for values in zip(*(table[k].tolist() for k in table))]
+    return {"accuracy": acc, "precision": prec, "recall": rec, "f1": f1, "roc_auc": roc,
+            "samples_per_s": samples_per_s, "thresholds": rows}
 
-    acc = accuracy_score(all_labels, all_preds)
-    prec = precision_score(all_labels, all_preds)
-    rec = recall_score(all_labels, all_preds)
-    f1 = f1_score(all_labels, all_preds)
-    roc = roc_auc_score(all_labels, all_preds)
-    print(f"Val Accuracy: {acc:.4f} | Precision: {prec:.4f} | Recall: {rec:.4f} | F1: {f1:.4f} | ROC AUC: {roc:.4f}")
+def threshold_report(metrics):
+    """Print the per-threshold table from evaluate_model and mark the F1-best cut-off."""
+    rows = metrics["thresholds"]
+    best = max(rows, key=lambda r: r["f1"])
+    print(f"{'threshold':>10}{'precision':>11}{'recall':>9}{'f1':>8}{'accuracy':>10}")
+    for r in rows:
+        mark = "  <- best F1" if r is best else ""
+        print(f"{r['threshold']:>10.2f}{r['precision']:>11.4f}{r['recall']:>9.4f}{r['f1']:>8.4f}{r['accuracy']:>10.4f}{mark}")
+
+def precision_report(summaries):
+    """Side-by-side epoch time and final validation metrics for runs returned by train_model / train()."""
+    print(f"{'precision':<10}{'s/epoch':>9}{'peak MB':>9}{'accuracy':>10}{'f1':>8}{'roc_auc':>9}")
+    for summary in summaries:
+        seconds = sum(summary["epoch_seconds"]) / max(len(summary["epoch_seconds"]), 1)
+        m = summary["metrics"]
+        print(f"{summary['precision']:<10}{seconds:>9.2f}{summary.get('peak_memory_mb', 0):>9.0f}"
+              f"{m.get('accuracy', 0):>10.4f}{m.get('f1', 0):>8.4f}{m.get('roc_auc', 0):>9.4f}")
 
 def save_model(model, path="adhd_model.pt"):
     torch.save(model.state_dict(), path)
 
 def load_model(model, path="adhd_model.pt"):
-    model.load_state_dict(torch.load(path))
+    if path.endswith(".safetensors"):
+        from safetensors.torch import load_file
+        model.load_state_dict(load_file(path))
+    else:
+        model.load_state_dict(torch.load(path))
+    model.eval()
+    return model
+
+def save_weights(model, path="adhd_model.safetensors"):
+    """Inference weights as safetensors, with the encoder config in the header so load_weights needs nothing else."""
+    from safetensors.torch import save_file
+    state_dict = {name: tensor.contiguous() for name, tensor in model.state_dict().items()}
+    save_file(state_dict, path, metadata={"bert_config": model.bert.config.to_json_string()})
+
+def load_weights(path="adhd_model.safetensors", device="cpu"):
+    """Memory-mapped load of a save_weights file, built on the meta device so nothing is copied."""
+    from safetensors import safe_open
+    from safetensors.torch import load_file
+    with safe_open(path, framework="pt") as f:
+        config = BertConfig.from_dict(json.loads(f.metadata()["bert_config"]))
+    with torch.device("meta"):
+        model = ADHDClassifier(bert_config=config)
+    model.load_state_dict(load_file(path, device=str(device)), assign=True)
+
+    # Non-persistent buffers aren't in the file, so rebuild the ones BertEmbeddings derives from the config
+    embeddings = model.bert.embeddings
+    positions = torch.arange(config.max_position_embeddings, device=device).expand((1, -1))
+    for name, value in (("position_ids", positions), ("token_type_ids", torch.zeros_like(positions))):
+        if getattr(embeddings, name, None) is not None:
+            embeddings.register_buffer(name, value, persistent=False)
+    left_on_meta = [name for name, t in model.named_buffers() if t.is_meta]
+    if left_on_meta:
+        raise RuntimeError(f"{path}: no values for buffers {left_on_meta}")
+    return model.eval()
+
+def save_training_checkpoint(path, model, optimizer, epoch, scheduler=None, seed=None, sampler=None):
+    """Weights, optimizer, scheduler, RNG state, split seed and sampler RNG after `epoch` finished."""
+    state = {
+        "model": model.state_dict(),
+        "optimizer": optimizer.state_dict(),
+        "scheduler": scheduler.state_dict() if scheduler is not None else None,
+        "epoch": epoch,
+        "seed": seed,
+        "rng": {
+            "python": random.getstate(),
+            "numpy": np.random.get_state(),
+            "torch": torch.get_rng_state(),
+            "cuda": torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None,
+            "sampler": sampler.rng.getstate() if isinstance(sampler, LengthBucketSampler) else None,
+        },
+    }
+    # Write then rename, so a preemption mid-save leaves the previous checkpoint intact
+    with atomic_file(path) as tmp_path:
+        torch.save(state, tmp_path)
+
+def read_training_checkpoint(path):
+    # RNG states are plain Python/numpy objects, which the weights-only unpickler rejects
+    return torch.load(path, map_location="cpu", weights_only=False)
+
+def load_training_checkpoint(path, model, optimizer, scheduler=None, sampler=None, state=None):
+    """Restore a save_training_checkpoint file (or its already-read state) and return the next epoch."""
+    state = state if state is not None else read_training_checkpoint(path)
+    model.load_state_dict(state["model"])
+    optimizer.load_state_dict(state["optimizer"])
+    if scheduler is not None and state["scheduler"] is not None:
+        scheduler.load_state_dict(state["scheduler"])
+    rng = state["rng"]
+    random.setstate(rng["python"])
+    np.random.set_state(rng["numpy"])
+    torch.set_rng_state(rng["torch"])
+    if rng["cuda"] is not None and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(rng["cuda"])
+    if isinstance(sampler, LengthBucketSampler) and rng.get("sampler") is not None:
+        sampler.rng.setstate(rng["sampler"])
+    return state["epoch"] + 1
+
+def quantize_dynamic_int8(model, inplace=False):
+    """Dynamic int8 copy of the model for CPU inference: Linear weights stored as int8, activations quantized on the fly."""
+    model = model.to("cpu").eval()
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=inplace)
+
+def save_quantized_model(model, path="adhd_model_int8.pt"):
+    """The encoder config goes with the int8 weights, so loading needs neither the fp32 model nor the HF cache."""
+    torch.save({"bert_config": model.bert.config.to_dict(), "state_dict": model.state_dict()}, path)
+
+def load_quantized_model(path="adhd_model_int8.pt"):
+    checkpoint = torch.load(path, map_location="cpu")
+    if "bert_config" in checkpoint:
+        config, state_dict = BertConfig.from_dict(checkpoint["bert_config"]), checkpoint["state_dict"]
+    else:
+        # Artifacts from before the config was stored: a bare state dict of the bert-base classifier
+        config, state_dict = BertConfig.from_pretrained(PRETRAINED_MODEL), checkpoint
+    # Built from the config and quantized in place: no pretrained weights read, no fp32 deep copy
+    model = quantize_dynamic_int8(ADHDClassifier(bert_config=config), inplace=True)
+    model.load_state_dict(state_dict)
+    model.eval()
+    return model
+
+def save_student_model(model, path="adhd_model_student.pt"):
+    """Weights plus encoder config, for students and pruned models of non-default size."""
+    torch.save({"bert_config": model.bert.config.to_dict(), "state_dict": model.state_dict()}, path)
+
+def load_student_model(path="adhd_model_student.pt"):
+    checkpoint = torch.load(path, map_location="cpu")
+    model = ADHDClassifier(bert_config=BertConfig.from_dict(checkpoint["bert_config"]))
+    model.load_state_dict(checkpoint["state_dict"])
     model.eval()
-    return model
\ No newline at end of file
+    return model
+
+def save_early_exit_model(model, path="adhd_model_early_exit.pt"):
+    torch.save({
+        "bert_config": model.base.bert.config.to_dict(),
+        "exit_layers": model.exit_layers,
+        "exit_threshold": model.exit_threshold,
+        "state_dict": model.state_dict()
+    }, path)
+
+def load_early_exit_model(path="adhd_model_early_exit.pt", exit_threshold=None):
+    checkpoint = torch.load(path, map_location="cpu")
+    base = ADHDClassifier(bert_config=BertConfig.from_dict(checkpoint["bert_config"]))
+    threshold = exit_threshold if exit_threshold is not None else checkpoint["exit_threshold"]
+    model = EarlyExitClassifier(base, checkpoint["exit_layers"], threshold)
+    model.load_state_dict(checkpoint["state_dict"])
+    model.eval()
+    return model
+
+def load_torchscript_model(path="adhd_model.ts"):
+    model = torch.jit.load(path, map_location="cpu")
+    model.eval()
+    return model
+
+class OnnxClassifier:
+    """ONNX Runtime session with ADHDClassifier.forward's call signature (needs onnxruntime)."""
+    def __init__(self, path="adhd_model.onnx", num_threads=None):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise RuntimeError("The ONNX backend needs onnxruntime: pip install onnxruntime")
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def eval(self):
+        return self
+
+    def __call__(self, input_ids, attention_mask, age, sex):
+        (logits,) = self.session.run(None, {
+            'input_ids': input_ids.cpu().numpy(),
+            'attention_mask': attention_mask.cpu().numpy(),
+            'age': age.cpu().numpy(),
+            'sex': sex.cpu().numpy()
+        })
+        return torch.from_numpy(logits)
+
+def predict_logits(model, texts, ages, sexes, batch_size=32, device="cpu"):
+    """Raw logits for parallel lists of responses/ages/sexes, one padded-to-longest forward pass per batch."""
+    texts, ages, sexes = list(texts), list(ages), list(sexes)
+    logits = []
+    model.eval()
+    with torch.no_grad():
+        for start in range(0, len(texts), batch_size):
+            end = start + batch_size
+            encoding = get_tokenizer()(
+                [str(t) for t in texts[start:end]],
+                truncation=True,
+                padding=True,
+                max_length=MAX_LEN,
+                return_tensors='pt'
+            )
+            age = torch.tensor([[a / 100.0] for a in ages[start:end]], dtype=torch.float)
+            sex = torch.tensor([[1.0 if str(s).lower() == 'male' else 0.0] for s in sexes[start:end]], dtype=torch.float)
+            out = model(
+                encoding['input_ids'].to(device),
+                encoding['attention_mask'].to(device),
+                age.to(device),
+                sex.to(device)
+            )
+            logits.append(out.view(-1).cpu())
+    return torch.cat(logits) if logits else torch.empty(0)
+
+def latency_ms(model, df, runs=3):
+    """Mean ms per answer scoring df's rows one at a time (batch size 1), after one warm-up row."""
+    predict_logits(model, df["response"][:1], df["age"][:1], df["sex"][:1])
+    start = time.perf_counter()
+    for _ in range(runs):
+        predict_logits(model, df["response"], df["age"], df["sex"], batch_size=1)
+    return (time.perf_counter() - start) / (runs * len(df)) * 1000
+
+def batch_to_device(batch, device):
+    """(input_ids, attention_mask, age, sex, label) of a collated batch, moved to device."""
+    return [batch[k].to(device) for k in ("input_ids", "attention_mask", "age", "sex", "label")]
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of NN scores for short, repetitive interview answers.
+
+Replies like "yes", "Not really." or "sometimes" come up constantly, so their
+score is stored in a local SQLite file keyed by the normalized answer text,
+an age bucket, sex and the model version (a fingerprint of the weights file).
+When the weights file changes, rows for the old version are dropped on the
+next lookup. Only answers of up to max_words words are cached; long answers
+are practically never repeated. The table is bounded to max_entries rows,
+evicting the least recently used.
+
+Used by neural_adhd_guidance (set ADHD_NN_CACHE=off to disable). Inspect with:
+
+    python answer_cache.py --stats
+    python answer_cache.py --clear
+"""
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = "adhd_score_cache.sqlite"
+
+
+def normalize_answer(text):
+    """Lower-case, trim, collapse whitespace and drop surrounding punctuation: "  Not really. " -> "not really"."""
+    text = re.sub(r"\s+", " ", str(text).lower()).strip()
+    return text.strip(" .,!?;:'\"")
+
+
+def model_fingerprint(path, backend=""):
+    """Cheap version id for a weights file: changes whenever the file is rewritten, without hashing its bytes."""
+    stat = os.stat(path)
+    raw = f"{backend}|{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class AnswerScoreCache:
+    def __init__(self, path=CACHE_PATH, max_entries=50000, max_words=12, age_bucket=5):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_words = max_words
+        self.age_bucket = age_bucket
+        self.hits = self.misses = 0
+        self._version = None
+        self._lock = threading.Lock()
+        # One connection shared by the NN worker threads, serialized by the lock
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")  # several station processes may share the file
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " answer TEXT, age_bucket INTEGER, sex INTEGER, version TEXT, score REAL, last_used REAL, hits INTEGER,"
+            " PRIMARY KEY (answer, age_bucket, sex, version))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)")
+        self._db.commit()
+
+    def key(self, answer, age, sex):
+        """Cache key for one answer, or None if it is too long to be worth caching."""
+        text = normalize_answer(answer)
+        if not text or len(text.split()) > self.max_words:
+            return None
+        return text, int(float(age) // self.age_bucket), int(str(sex).lower() == "male")
+
+    def _set_version(self, version):
+        if version != self._version:
+            self._db.execute("DELETE FROM scores WHERE version != ?", (version,))
+            self._db.commit()
+            self._version = version
+
+    def get_many(self, keys, version):
+        """Cached scores for keys (None for misses and uncacheable answers)."""
+        scores = [None] * len(keys)
+        with self._lock:
+            self._set_version(version)
+            now = time.time()
+            for i, key in enumerate(keys):
+                if key is None:
+                    continue
+                row = self._db.execute(
+                    "SELECT score FROM scores WHERE answer = ? AND age_bucket = ? AND sex = ? AND version = ?",
+                    (*key, version)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    continue
+                self.hits += 1
+                scores[i] = row[0]
+                self._db.execute(
+                    "UPDATE scores SET last_used = ?, hits = hits + 1"
+                    " WHERE answer = ? AND age_bucket = ? AND sex = ? AND version = ?",
+                    (now, *key, version)
+                )
+            self._db.commit()
+        return scores
+
+    def put_many(self, entries, version):
+        """Store (key, score) pairs, then evict least recently used rows beyond max_entries."""
+        entries = [(key, score) for key, score in entries if key is not None]
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            self._set_version(version)
+            self._db.executemany(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, 0)",
+                [(*key, version, score, now) for key, score in entries]
+            )
+            (count,) = self._db.execute("SELECT COUNT(*) FROM scores").fetchone()
+            if count > self.max_entries:
+                # Evict down to 90% so this doesn't run again on the very next insert
+                excess = count - int(self.max_entries * 0.9)
+                self._db.execute(
+                    "DELETE FROM scores WHERE rowid IN (SELECT rowid FROM scores ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+            self._db.commit()
+
+    def stats(self):
+        """Hit rate of this process, plus row count and hits served by the current rows across all processes."""
+        with self._lock:
+            entries, stored_hits = self._db.execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM scores").fetchone()
+        lookups = self.hits + self.misses
+        return {"entries": entries, "stored_hits": stored_hits, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM scores")
+            self._db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=os.getenv("ADHD_NN_CACHE", CACHE_PATH))
+    parser.add_argument("--stats", action="store_true", help="show the most reused cached answers")
+    parser.add_argument("--clear", action="store_true", help="delete every cached score")
+    args = parser.parse_args()
+
+    cache = AnswerScoreCache(args.path)
+    if args.clear:
+        cache.clear()
+        print(f"✅ Cleared {args.path}")
+    if args.stats or not args.clear:
+        rows = cache._db.execute(
+            "SELECT answer, COUNT(*), SUM(hits) FROM scores GROUP BY answer ORDER BY SUM(hits) DESC LIMIT 20"
+        ).fetchall()
+        stats = cache.stats()
+        print(f"{stats['entries']} cached scores in {args.path}, {stats['stored_hits']} inferences skipped")
+        for answer, variants, hits in rows:
+            print(f"  {hits:>8} hits  {answer!r} ({variants} age/sex variants)")
+
+
+if __name__ == "__main__":
+    main()
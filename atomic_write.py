@@ -0,0 +1,49 @@
+"""
+Write-then-rename helpers for caches and checkpoints.
+
+Output goes to a temporary name unique to the process, next to the
+destination, and is renamed into place only once it is complete. An
+interrupted write never looks finished, and processes writing the same
+output at once never touch each other's temporary files.
+"""
+import contextlib
+import os
+import shutil
+import tempfile
+
+
+@contextlib.contextmanager
+def atomic_file(path):
+    """Yields a temporary file path that replaces path when the block completes."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@contextlib.contextmanager
+def atomic_dir(path, replace=False):
+    """
+    Yields a fresh temporary directory that is renamed to path when the block completes.
+    If another process publishes path first, its copy is kept; replace=True removes an existing path first.
+    """
+    parent = os.path.dirname(path) or "."
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=parent, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        yield tmp_path
+        if replace:
+            shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Inference benchmark for evaluate_answer_traits.
+
+Runs on CPU against a randomly initialised ADHDClassifier (bert-base sized, no
+weight download), saved once to a temporary .safetensors file and loaded
+through the normal neural_adhd_guidance path. Measures:
+
+  cold start  - fresh interpreter: import, model load, first answer scored
+  warm        - p50/p95/p99 latency of evaluate_answer_traits on one answer
+  throughput  - samples/s of the model forward for each batch size x sequence length
+  memory      - peak RSS of the benchmark process and of the cold-start process
+
+Results go to a JSON file. With --baseline, every metric is compared against
+an earlier run and the script exits non-zero on a regression beyond --tolerance.
+If the bert-base-uncased tokenizer is not in the local cache and cannot be
+downloaded, a small stand-in WordPiece vocab is used (token counts then differ
+from production, so only compare runs made the same way).
+
+    python benchmark_inference.py --out bench_v1.3.json
+    python benchmark_inference.py --out bench_new.json --baseline bench_v1.3.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import torch
+from transformers import BertConfig, BertTokenizerFast
+
+import adhd_nn_diagnosis_model
+from adhd_nn_diagnosis_model import ADHDClassifier, get_tokenizer, peak_memory_mb, save_weights
+
+SAMPLE_ANSWERS = [
+    "Yes.",
+    "Not really.",
+    "Sometimes",
+    "I often lose focus during conversations and find it hard to sit still.",
+    "I try to concentrate but my mind constantly jumps between things.",
+    "Not really, I can usually finish what I start unless it is something really boring like paperwork.",
+]
+BATCH_SIZES = [1, 4, 16, 32]
+SEQ_LENGTHS = [16, 32, 64, 128]
+# Metrics where a larger value is a regression; the rest (throughput) regress when they shrink
+LOWER_IS_BETTER = ("cold_start_s", "warm_p50_ms", "warm_p95_ms", "warm_p99_ms", "peak_rss_mb", "cold_start_rss_mb")
+
+# Run in a fresh interpreter, so the numbers include imports and the model load
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+import adhd_nn_diagnosis_model
+import neural_adhd_guidance
+weights, tokenizer_dir = sys.argv[1], sys.argv[2]
+if tokenizer_dir:
+    from transformers import BertTokenizerFast
+    adhd_nn_diagnosis_model._tokenizer = BertTokenizerFast.from_pretrained(tokenizer_dir)
+neural_adhd_guidance.reload_model(path=weights, backend="fp32")
+neural_adhd_guidance.evaluate_answer_traits("Q1", "I often lose focus.", 30, "male")
+seconds = time.perf_counter() - start
+import torch
+print(json.dumps({"seconds": seconds, "rss_mb": adhd_nn_diagnosis_model.peak_memory_mb(torch.device("cpu"))}))
+"""
+
+
+def ensure_tokenizer(work_dir):
+    """Return None if the real tokenizer loads, else the directory of a stand-in tokenizer now in use."""
+    try:
+        get_tokenizer()
+        return None
+    except Exception as e:
+        print(f"⚠️ bert-base-uncased tokenizer unavailable ({type(e).__name__}); using a stand-in vocab")
+    words = sorted({w for answer in SAMPLE_ANSWERS for w in re.findall(r"\w+|[^\w\s]", answer.lower())})
+    chars = list("abcdefghijklmnopqrstuvwxyz0123456789.,'?!")
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words + chars + [f"##{c}" for c in chars]
+    vocab_path = os.path.join(work_dir, "vocab.txt")
+    with open(vocab_path, "w") as f:
+        f.write("\n".join(dict.fromkeys(vocab)))
+    tokenizer = BertTokenizerFast(vocab_file=vocab_path, do_lower_case=True)
+    tokenizer_dir = os.path.join(work_dir, "tokenizer")
+    tokenizer.save_pretrained(tokenizer_dir)
+    adhd_nn_diagnosis_model._tokenizer = tokenizer
+    return tokenizer_dir
+
+
+def cold_start(weights, tokenizer_dir, runs):
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", COLD_START, weights, tokenizer_dir or ""],
+            cwd=here, capture_output=True, text=True,
+            env={**os.environ, "ADHD_NN_BACKEND": "fp32", "CUDA_VISIBLE_DEVICES": ""}
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"Cold-start run failed:\n{proc.stderr[-2000:]}")
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return min(r["seconds"] for r in results), max(r["rss_mb"] for r in results)
+
+
+def warm_latency(runs):
+    import neural_adhd_guidance
+
+    for answer in SAMPLE_ANSWERS:
+        # evaluate_answer_traits reports failures as UNKNOWN instead of raising; don't time those
+        if neural_adhd_guidance.evaluate_answer_traits("Q", answer, 30, "female")["trait"] == "UNKNOWN":
+            raise RuntimeError("evaluate_answer_traits failed, see [NN ERROR] above")
+    times = []
+    for i in range(runs):
+        answer = SAMPLE_ANSWERS[i % len(SAMPLE_ANSWERS)]
+        start = time.perf_counter()
+        neural_adhd_guidance.evaluate_answer_traits("Q", answer, 30, "female")
+        times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, [50, 95, 99]).tolist()
+
+
+def throughput(model, batch_sizes, seq_lengths, min_seconds=1.0):
+    """samples/s of the bare forward pass on random token ids, per (batch size, sequence length)."""
+    vocab_size = model.bert.config.vocab_size
+    results = {}
+    with torch.no_grad():
+        for seq_len in seq_lengths:
+            for batch_size in batch_sizes:
+                ids = torch.randint(5, vocab_size, (batch_size, seq_len))  # skip the special tokens
+                mask = torch.ones_like(ids)
+                age, sex = torch.full((batch_size, 1), 0.3), torch.zeros((batch_size, 1))
+                model(ids, mask, age, sex)
+                calls, start = 0, time.perf_counter()
+                while calls < 3 or time.perf_counter() - start < min_seconds:
+                    model(ids, mask, age, sex)
+                    calls += 1
+                results[f"throughput_b{batch_size}_s{seq_len}"] = calls * batch_size / (time.perf_counter() - start)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print metric-by-metric change against a baseline run; returns the names of regressed metrics."""
+    regressed = []
+    print(f"\n{'metric':<26}{'baseline':>12}{'now':>12}{'change':>9}")
+    for name, now in results["metrics"].items():
+        before = baseline["metrics"].get(name)
+        if not before:
+            continue
+        change = now / before - 1
+        worse = change > tolerance if name in LOWER_IS_BETTER else change < -tolerance
+        if worse:
+            regressed.append(name)
+        print(f"{name:<26}{before:>12.2f}{now:>12.2f}{change:>+9.1%}{'  ❌' if worse else ''}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown before failing")
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = library default)")
+    parser.add_argument("--runs", type=int, default=200, help="warm evaluate_answer_traits calls")
+    parser.add_argument("--cold-runs", type=int, default=3, help="cold starts (the fastest is reported)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--seq-lengths", type=int, nargs="+", default=SEQ_LENGTHS)
+    args = parser.parse_args()
+
+    # Repeated sample answers would otherwise be served from the score cache instead of the model
+    os.environ["ADHD_NN_CACHE"] = "off"
+    # CPU only: ModelHolder would otherwise put the warm-latency model on a GPU while throughput runs on CPU.
+    # CUDA initialises lazily, so hiding the devices here (before any CUDA call) is enough.
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    if torch.cuda.is_available():
+        raise SystemExit("CUDA was initialised before the benchmark could hide it; run with CUDA_VISIBLE_DEVICES=''")
+    if args.threads:
+        torch.set_num_threads(args.threads)
+        os.environ["ADHD_NN_THREADS"] = str(args.threads)
+    torch.manual_seed(0)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        tokenizer_dir = ensure_tokenizer(work_dir)
+        config = BertConfig(vocab_size=get_tokenizer().vocab_size)
+        model = ADHDClassifier(bert_config=config).eval()
+        weights = os.path.join(work_dir, "random_model.safetensors")
+        save_weights(model, weights)
+
+        import neural_adhd_guidance
+        if not neural_adhd_guidance.reload_model(path=weights, backend="fp32"):
+            sys.exit(1)
+
+        print("Cold start...")
+        cold_s, cold_rss = cold_start(weights, tokenizer_dir, args.cold_runs)
+        print("Warm latency...")
+        p50, p95, p99 = warm_latency(args.runs)
+        print("Throughput...")
+        metrics = {"cold_start_s": cold_s, "cold_start_rss_mb": cold_rss,
+                   "warm_p50_ms": p50, "warm_p95_ms": p95, "warm_p99_ms": p99}
+        metrics.update(throughput(model, args.batch_sizes, args.seq_lengths))
+        metrics["peak_rss_mb"] = peak_memory_mb(torch.device("cpu"))
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "threads": torch.get_num_threads(),
+            "device": "cpu",
+            "stand_in_tokenizer": tokenizer_dir is not None,
+        },
+        "metrics": metrics,
+    }
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\nCold start {cold_s:.2f}s ({cold_rss:.0f} MB) | warm p50 {p50:.1f} ms, p95 {p95:.1f} ms, "
+          f"p99 {p99:.1f} ms | peak RSS {metrics['peak_rss_mb']:.0f} MB")
+    print(f"{'samples/s':<10}" + "".join(f"{f'b={b}':>10}" for b in args.batch_sizes))
+    for seq_len in args.seq_lengths:
+        print(f"{f'seq={seq_len}':<10}" + "".join(
+            f"{metrics[f'throughput_b{b}_s{seq_len}']:>10.1f}" for b in args.batch_sizes))
+    print(f"✅ Results saved to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressed = compare(results, json.load(f), args.tolerance)
+        if regressed:
+            print(f"❌ Regressed beyond {args.tolerance:.0%}: {', '.join(regressed)}")
+            sys.exit(1)
+        print("✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
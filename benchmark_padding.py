@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Padding benchmark - compares per-batch BERT forward time for fixed MAX_LEN padding,
+dynamic (pad-to-longest) padding and dynamic padding with length bucketing.
+
+    python benchmark_padding.py --batch-size 16 --repeat 20
+"""
+import argparse
+import time
+
+import pandas as pd
+import torch
+from torch.utils.data import DataLoader
+
+from adhd_nn_diagnosis_model import (
+    ADHDClassifier, ADHDInterviewDataset, LengthBucketSampler, collate_batch, get_tokenizer, MAX_LEN
+)
+from transcript_ingest import DATA_DIR, load_transcript_dir
+
+
+def collate_fixed(batch):
+    """Baseline: pad every batch to MAX_LEN like the old tokenizer(padding='max_length') call."""
+    out = collate_batch(batch)
+    extra = MAX_LEN - out["input_ids"].size(1)
+    if extra > 0:
+        pad = torch.full((out["input_ids"].size(0), extra), get_tokenizer().pad_token_id, dtype=torch.long)
+        out["input_ids"] = torch.cat([out["input_ids"], pad], dim=1)
+        out["attention_mask"] = torch.cat([out["attention_mask"], torch.zeros_like(pad)], dim=1)
+    return out
+
+
+def time_loader(model, loader):
+    times, widths = [], []
+    with torch.no_grad():
+        for batch in loader:
+            start = time.perf_counter()
+            model(batch["input_ids"], batch["attention_mask"], batch["age"], batch["sex"])
+            times.append(time.perf_counter() - start)
+            widths.append(batch["input_ids"].size(1))
+    return sum(times) / len(times), sum(widths) / len(widths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=20, help="replicate the (small) CSVs to get enough batches")
+    args = parser.parse_args()
+
+    df = pd.concat([load_transcript_dir(args.data_dir)] * args.repeat, ignore_index=True)
+    dataset = ADHDInterviewDataset(df)
+    model = ADHDClassifier().eval()
+
+    loaders = {
+        "fixed MAX_LEN": DataLoader(dataset, batch_size=args.batch_size, shuffle=True, collate_fn=collate_fixed),
+        "dynamic": DataLoader(dataset, batch_size=args.batch_size, shuffle=True, collate_fn=collate_batch),
+        "dynamic + bucketed": DataLoader(
+            dataset,
+            batch_sampler=LengthBucketSampler(dataset.lengths(), args.batch_size, seed=0),
+            collate_fn=collate_batch
+        ),
+    }
+
+    # Warm-up pass so the first mode doesn't absorb one-off init cost
+    time_loader(model, DataLoader(dataset, batch_size=args.batch_size, collate_fn=collate_batch))
+
+    print(f"{len(df)} rows, batch size {args.batch_size}, {torch.get_num_threads()} threads")
+    print(f"{'mode':<22}{'ms/batch':>10}{'avg width':>11}{'speedup':>9}")
+    baseline = None
+    for name, loader in loaders.items():
+        per_batch, width = time_loader(model, loader)
+        baseline = baseline or per_batch
+        print(f"{name:<22}{per_batch * 1000:>10.1f}{width:>11.1f}{baseline / per_batch:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
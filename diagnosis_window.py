@@ -1,6 +1,7 @@
 # diagnosis_window.py
 
 import cv2
+import queue
 import threading
 import json
 import uuid
@@ -17,9 +18,8 @@ from PyQt5.QtCore import Qt, QTimer, QEventLoop, QUrl, QPointF, pyqtSignal, QThr
 from PyQt5.QtGui  import QImage, QPixmap, QPainter, QColor, QPen, QPolygonF
 from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
 
-from TTS.api import TTS
 from gptoss_client import chat
-from neural_adhd_guidance import evaluate_answer_traits
+from neural_adhd_guidance import evaluate_answer_traits, preload_model
 
 logging.basicConfig(level=logging.DEBUG)
 logging.debug("diagnosis_window loaded")
@@ -278,6 +278,31 @@ class LLMFollowUpWorker(QThread):
         except Exception as e:
             self.error.emit(str(e))
 
+# ───────────────────────────────────────────────────────────────────────────────
+# NN WORKER (keeps BERT inference off the UI and voice-capture threads)
+# ───────────────────────────────────────────────────────────────────────────────
+class TraitEvalWorker(QThread):
+    done = pyqtSignal(object, dict)  # context passed to submit(), traits
+
+    def __init__(self):
+        super().__init__()
+        self._requests = queue.Queue()
+
+    def submit(self, question, answer, age, sex, context=None):
+        self._requests.put((question, answer, age, sex, context))
+
+    def stop(self):
+        self._requests.put(None)
+
+    def run(self):
+        preload_model()
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            question, answer, age, sex, context = request
+            self.done.emit(context, evaluate_answer_traits(question, answer, age, sex))
+
 # ───────────────────────────────────────────────────────────────────────────────
 # Main window
 # ───────────────────────────────────────────────────────────────────────────────
@@ -306,6 +331,13 @@ class DiagnosisWindow(QWidget):
             return
         self.participant_age, self.participant_sex = info_dialog.get_info()
 
+        # NN trait worker: loads BERT in the background, then scores answers off the interview thread
+        self._pending_answer = None
+        self._answer_lock = threading.Lock()
+        self.trait_worker = TraitEvalWorker()
+        self.trait_worker.done.connect(self.on_traits_done)
+        self.trait_worker.start()
+
         self.setWindowTitle("Diagnosis Interview")
         self.setGeometry(100, 100, 1200, 720)
         self.media_player = QMediaPlayer(self)
@@ -379,7 +411,8 @@ class DiagnosisWindow(QWidget):
         # Speak intro and capture a "yes" before starting
         QTimer.singleShot(500, self.play_intro)
 
-        # TTS (Coqui)
+        # TTS (Coqui) - imported here because the package takes seconds to import
+        from TTS.api import TTS
         self.tts = TTS("tts_models/en/ljspeech/tacotron2-DDC")
 
         # LLM workers
@@ -561,30 +594,52 @@ class DiagnosisWindow(QWidget):
         self.awaiting_repeat_reply = False
         question = self.question_label.text()
 
-        # 1) Fast local heuristic/NN pass (unchanged)
-        traits = evaluate_answer_traits(question, text, self.participant_age, self.participant_sex)
-        if traits.get("trait") == "UNKNOWN":
-            traits["trait"] = "INATTENTION" if "focus" in text.lower() else "IMPULSIVITY"
-            traits["completeness"] = 0.9 if len(text.split()) > 8 else 0.4
-
-        # Log the raw response early
+        # Log the raw response early; NN traits are filled in when they arrive
         self.transcript_log.append({
             "question": question,
-            "response": text,
-            "trait": traits.get("trait", "UNKNOWN"),
-            "completeness": traits.get("completeness", 1.0)
+            "response": text
         })
+        pending = {"text": text, "entry": self.transcript_log[-1], "traits": None, "classify": None}
+        self._pending_answer = pending
 
-        # 2) Non-blocking LLM classification
         self.feedback_display.setText("Processing your response…")
         self.confirm_button.hide()
         self.retry_button.hide()
 
+        # 1) NN trait pass and 2) LLM classification run concurrently; on_classify_done fires once both are in
+        self.trait_worker.submit(question, text, self.participant_age, self.participant_sex, context=pending)
+
         self._classify_worker = LLMClassifyWorker(question, text)
-        self._classify_worker.done.connect(lambda action, tag, raw: self.on_classify_done(text, traits, action, tag, raw))
+        self._classify_worker.done.connect(lambda action, tag, raw: self.on_classify_result(pending, action, tag, raw))
         self._classify_worker.error.connect(self.on_llm_error)
         self._classify_worker.start()
 
+    def on_traits_done(self, pending, traits):
+        """Handle NN trait result (falls back to the keyword heuristic if the model failed)."""
+        text = pending["text"]
+        if traits.get("trait") == "UNKNOWN":
+            traits["trait"] = "INATTENTION" if "focus" in text.lower() else "IMPULSIVITY"
+            traits["completeness"] = 0.9 if len(text.split()) > 8 else 0.4
+
+        pending["entry"]["trait"] = traits.get("trait", "UNKNOWN")
+        pending["entry"]["completeness"] = traits.get("completeness", 1.0)
+        pending["traits"] = traits
+        self._finish_answer(pending)
+
+    def on_classify_result(self, pending, action, tag, raw_json):
+        pending["classify"] = (action, tag, raw_json)
+        self._finish_answer(pending)
+
+    def _finish_answer(self, pending):
+        # Results arrive on different threads; only the second one for the current answer proceeds.
+        # Answers that were superseded (retry) or abandoned (LLM error) are ignored.
+        with self._answer_lock:
+            if pending is not self._pending_answer or pending["traits"] is None or pending["classify"] is None:
+                return
+            self._pending_answer = None
+        action, tag, raw_json = pending["classify"]
+        self.on_classify_done(pending["text"], pending["traits"], action, tag, raw_json)
+
     def on_classify_done(self, user_text, traits, action, tag, raw_json):
         """Handle LLM classification result."""
         # Save LLM decision into the last log entry
@@ -620,6 +675,7 @@ class DiagnosisWindow(QWidget):
         })
 
     def on_llm_error(self, msg):
+        self._pending_answer = None
         # Graceful fallback: continue with confirm/retry
         self.feedback_display.setText("Continuing without AI follow-up. (LLM error)")
         self.confirm_button.show()
@@ -696,5 +752,9 @@ Follow-up:"""
 
     def closeEvent(self, event):
         self.capture.release()
+        trait_worker = getattr(self, "trait_worker", None)
+        if trait_worker is not None:
+            trait_worker.stop()
+            trait_worker.wait()
         super().closeEvent(event)
 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Knowledge distillation: train a compact student ADHDClassifier from a trained teacher.
+
+The student keeps the teacher's tokenizer and age/sex head but has fewer and/or
+narrower encoder layers. When the hidden size matches, it starts from the
+teacher's embeddings and an evenly spaced subset of its layers (DistilBERT-style).
+Loss = alpha * soft-target BCE at temperature T + (1 - alpha) * BCE on labels.
+
+    python distill_model.py --teacher adhd_model.pt --csv your_training_data.csv \
+        --layers 4 --out adhd_model_student.pt
+
+Use the result at inference time with ADHD_NN_BACKEND=student.
+"""
+import argparse
+import io
+import time
+
+import torch
+import torch.nn as nn
+
+from adhd_nn_diagnosis_model import (
+    ADHDClassifier, LEARNING_RATE, batch_to_device, latency_ms, predict_logits, save_student_model
+)
+from train_model import load_datasets, make_loader
+from transcript_ingest import DATA_DIR, load_transcript_dir
+
+
+def build_student(teacher, num_layers=4, hidden_size=None, num_heads=None, intermediate_size=None):
+    config = teacher.bert.config.__class__.from_dict(teacher.bert.config.to_dict())
+    config.num_hidden_layers = num_layers
+    if hidden_size:
+        config.hidden_size = hidden_size
+        config.num_attention_heads = num_heads or max(hidden_size // 64, 1)
+        config.intermediate_size = intermediate_size or hidden_size * 4
+    student = ADHDClassifier(bert_config=config)
+
+    if config.hidden_size == teacher.bert.config.hidden_size:
+        # Same width: copy embeddings, pooler, head and every k-th teacher layer
+        student.bert.embeddings.load_state_dict(teacher.bert.embeddings.state_dict())
+        student.bert.pooler.load_state_dict(teacher.bert.pooler.state_dict())
+        student.fc.load_state_dict(teacher.fc.state_dict())
+        teacher_layers = teacher.bert.encoder.layer
+        stride = len(teacher_layers) / num_layers
+        for i, layer in enumerate(student.bert.encoder.layer):
+            layer.load_state_dict(teacher_layers[int(i * stride)].state_dict())
+    return student
+
+
+def distill(teacher, student, train_loader, epochs=3, temperature=2.0, alpha=0.5, lr=LEARNING_RATE * 5):
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    teacher.to(device).eval()
+    student.to(device)
+    optimizer = torch.optim.AdamW(student.parameters(), lr=lr)
+    hard_loss_fn = nn.BCEWithLogitsLoss()
+
+    for epoch in range(epochs):
+        student.train()
+        start = time.perf_counter()
+        for batch in train_loader:
+            ids, mask, age, sex, labels = batch_to_device(batch, device)
+            with torch.no_grad():
+                soft_targets = torch.sigmoid(teacher(ids, mask, age, sex).view(-1) / temperature)
+
+            logits = student(ids, mask, age, sex).view(-1)
+            # T^2 keeps the soft-target gradient scale independent of the temperature
+            soft_loss = nn.functional.binary_cross_entropy_with_logits(logits / temperature, soft_targets)
+            loss = alpha * soft_loss * temperature ** 2 + (1 - alpha) * hard_loss_fn(logits, labels.view(-1))
+
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+        print(f"Epoch {epoch+1}/{epochs} | Loss: {loss.item():.4f} | {time.perf_counter() - start:.1f}s")
+    return student.eval()
+
+
+def weights_mb(model):
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def report(teacher, student, data_dir=DATA_DIR):
+    """Latency, size and teacher agreement on the (deduplicated) transcript CSVs in data_dir."""
+    df = load_transcript_dir(data_dir)
+    teacher, student = teacher.to("cpu").eval(), student.to("cpu").eval()
+
+    t_logits = predict_logits(teacher, df["response"], df["age"], df["sex"])
+    s_logits = predict_logits(student, df["response"], df["age"], df["sex"])
+    agreement = ((t_logits > 0) == (s_logits > 0)).float().mean().item()
+    prob_gap = (torch.sigmoid(t_logits) - torch.sigmoid(s_logits)).abs().mean().item()
+
+    print(f"\nDistillation report ({len(df)} transcript rows)")
+    print(f"{'model':<10}{'params (M)':>12}{'weights MB':>12}{'ms/answer':>11}")
+    for name, model in (("teacher", teacher), ("student", student)):
+        params = sum(p.numel() for p in model.parameters()) / 1e6
+        print(f"{name:<10}{params:>12.1f}{weights_mb(model):>12.1f}{latency_ms(model, df):>11.1f}")
+    print(f"Label agreement with teacher: {agreement:.2%} | mean |prob diff|: {prob_gap:.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teacher", default="adhd_model.pt", help="trained ADHDClassifier state dict")
+    parser.add_argument("--csv", default="your_training_data.csv")
+    parser.add_argument("--out", default="adhd_model_student.pt")
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--hidden", type=int, default=None, help="student hidden size (default: teacher's)")
+    parser.add_argument("--heads", type=int, default=None)
+    parser.add_argument("--intermediate", type=int, default=None)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--temperature", type=float, default=2.0)
+    parser.add_argument("--alpha", type=float, default=0.5, help="weight of the soft-target loss")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="transcript CSVs for the report")
+    args = parser.parse_args()
+
+    teacher = ADHDClassifier()
+    teacher.load_state_dict(torch.load(args.teacher, map_location="cpu"))
+    student = build_student(teacher, args.layers, args.hidden, args.heads, args.intermediate)
+
+    train_ds, _ = load_datasets(args.csv)
+    train_loader = make_loader(train_ds, batch_size=args.batch_size, shuffle=True)
+    distill(teacher, student, train_loader, args.epochs, args.temperature, args.alpha)
+
+    save_student_model(student, args.out)
+    print(f"✅ Student model saved to {args.out}")
+    report(teacher, student, args.data_dir)
+
+
+if __name__ == "__main__":
+    main()
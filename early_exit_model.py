@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Confidence-based early exit for a trained ADHDClassifier.
+
+Small exit heads are attached to intermediate encoder layers (3, 6 and 9 by
+default) and trained on the transcript labels while the fine-tuned model stays
+frozen, so its own final head is unchanged. At inference an answer stops at
+the first exit whose confidence max(p, 1 - p) reaches the threshold; clear-cut
+answers skip the upper layers, hard ones still run all 12.
+
+The report runs every transcript CSV at several thresholds and compares with
+the full model: average layers used, latency per answer, agreement with the
+full model and accuracy on the labels.
+
+    python early_exit_model.py --model adhd_model.pt --csv your_training_data.csv \
+        --exits 3 6 9 --out adhd_model_early_exit.pt
+
+Use the result at inference time with ADHD_NN_BACKEND=early_exit
+(ADHD_NN_EXIT_THRESHOLD sets the confidence, default 0.9).
+"""
+import argparse
+import time
+
+import torch
+import torch.nn as nn
+
+from adhd_nn_diagnosis_model import (
+    ADHDClassifier, EarlyExitClassifier, LEARNING_RATE, batch_to_device, predict_logits, save_early_exit_model
+)
+from train_model import load_datasets, make_loader
+from transcript_ingest import DATA_DIR, feature_arrays, load_transcript_dir
+REPORT_THRESHOLDS = [0.8, 0.9, 0.95, 0.99]
+
+
+def train_exits(model, train_loader, epochs=3, lr=LEARNING_RATE * 50):
+    """Fit the exit heads with BCE on the labels; the wrapped classifier is frozen."""
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model.to(device)
+    for param in model.base.parameters():
+        param.requires_grad = False
+    model.base.eval()
+    optimizer = torch.optim.AdamW(model.exits.parameters(), lr=lr)
+    loss_fn = nn.BCEWithLogitsLoss()
+
+    for epoch in range(epochs):
+        model.exits.train()
+        start = time.perf_counter()
+        for batch in train_loader:
+            ids, mask, age, sex, labels = batch_to_device(batch, device)
+            with torch.no_grad():
+                hidden_states = model.base.bert(input_ids=ids, attention_mask=mask, output_hidden_states=True).hidden_states
+            loss = sum(
+                loss_fn(model.exit_logits(i, hidden_states[layer], age, sex).view(-1), labels.view(-1))
+                for i, layer in enumerate(model.exit_layers)
+            )
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+        print(f"Epoch {epoch+1}/{epochs} | Exit loss: {loss.item() / len(model.exit_layers):.4f}"
+              f" | {time.perf_counter() - start:.1f}s")
+    return model.eval()
+
+
+def run_one_by_one(model, df):
+    """Logits, layers used and ms/answer scoring one answer at a time, like an interview."""
+    logits, layers = [], []
+    predict_logits(model, df["response"][:1], df["age"][:1], df["sex"][:1])
+    start = time.perf_counter()
+    for i in range(len(df)):
+        logits.append(predict_logits(model, df["response"][i:i + 1], df["age"][i:i + 1], df["sex"][i:i + 1]))
+        layers.append(model.last_layers_used.float() if isinstance(model, EarlyExitClassifier) else None)
+    ms = (time.perf_counter() - start) / len(df) * 1000
+    used = torch.cat(layers).mean().item() if layers[0] is not None else None
+    return torch.cat(logits), used, ms
+
+
+def report(model, data_dir=DATA_DIR, thresholds=REPORT_THRESHOLDS):
+    df = load_transcript_dir(data_dir)
+    labels = torch.from_numpy(feature_arrays(df)["label"])
+    model = model.to("cpu").eval()
+    num_layers = model.base.bert.config.num_hidden_layers
+
+    full_logits, _, full_ms = run_one_by_one(model.base, df)
+    full_acc = ((full_logits > 0).float() == labels).float().mean().item()
+
+    print(f"\nEarly-exit report ({len(df)} transcript rows, exits at layers {model.exit_layers})")
+    print(f"{'threshold':<11}{'avg layers':>11}{'ms/answer':>11}{'saved':>8}{'agreement':>11}{'accuracy':>10}{'change':>9}")
+    print(f"{'full':<11}{num_layers:>11.1f}{full_ms:>11.1f}{'-':>8}{'-':>11}{full_acc:>10.2%}{'-':>9}")
+    original = model.exit_threshold
+    for threshold in thresholds:
+        model.exit_threshold = threshold
+        logits, layers, ms = run_one_by_one(model, df)
+        agreement = ((logits > 0) == (full_logits > 0)).float().mean().item()
+        acc = ((logits > 0).float() == labels).float().mean().item()
+        print(f"{threshold:<11}{layers:>11.1f}{ms:>11.1f}{1 - ms / full_ms:>8.0%}{agreement:>11.2%}"
+              f"{acc:>10.2%}{acc - full_acc:>+9.2%}")
+    model.exit_threshold = original
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="adhd_model.pt", help="trained ADHDClassifier state dict")
+    parser.add_argument("--csv", default="your_training_data.csv")
+    parser.add_argument("--out", default="adhd_model_early_exit.pt")
+    parser.add_argument("--exits", type=int, nargs="+", default=[3, 6, 9], help="encoder layers with an exit head")
+    parser.add_argument("--threshold", type=float, default=0.9, help="default exit confidence stored with the model")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--data-dir", default=DATA_DIR, help="transcript CSVs for the report")
+    args = parser.parse_args()
+
+    base = ADHDClassifier()
+    base.load_state_dict(torch.load(args.model, map_location="cpu"))
+    model = EarlyExitClassifier(base, args.exits, args.threshold)
+
+    train_ds, _ = load_datasets(args.csv)
+    train_exits(model, make_loader(train_ds, batch_size=args.batch_size, shuffle=True), args.epochs)
+
+    save_early_exit_model(model, args.out)
+    print(f"✅ Early-exit model saved to {args.out}")
+    report(model, args.data_dir)
+
+
+if __name__ == "__main__":
+    main()
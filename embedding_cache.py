@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Frozen-encoder embedding cache for fast head-only retraining.
+
+The pooled BERT embedding of every response is computed once and kept in a
+compact on-disk array keyed by a hash of the text, under a directory named
+after the encoder (model name, plus a hash of the weights file when a
+fine-tuned ADHDClassifier is used) and the truncation length. The age/sex `fc` head is then trained and
+evaluated straight from the cache, which takes seconds instead of a full
+BERT forward/backward over the dataset.
+
+    python embedding_cache.py --csv your_training_data.csv --encoder adhd_model.pt \
+        --epochs 200 --save adhd_model_newhead.pt
+"""
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import torch
+import torch.nn as nn
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from adhd_nn_diagnosis_model import ADHDClassifier, MAX_LEN, PRETRAINED_MODEL, get_tokenizer
+from token_cache import file_hash
+from transcript_ingest import feature_arrays, labelled_transcripts, read_transcripts
+
+CACHE_DIR = ".embedding_cache"
+KEY_BYTES = 20  # sha1 digest
+
+
+def text_key(text):
+    return hashlib.sha1(str(text).encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """Pooled encoder embeddings keyed by text hash; missing texts are encoded and appended on lookup."""
+
+    def __init__(self, model, model_name, cache_dir=CACHE_DIR, batch_size=32, max_len=MAX_LEN):
+        self.model = model.eval()
+        self.batch_size = batch_size
+        self.max_len = max_len
+        safe_name = model_name.replace("/", "_").replace("\\", "_")
+        # Embeddings truncated at another length are different vectors for the same text
+        self.path = os.path.join(cache_dir, f"{safe_name}-len{max_len}")
+        self.keys, self.embeddings = self._load()
+        self.index = {key: i for i, key in enumerate(self.keys)}
+
+    def _load(self):
+        keys_path = os.path.join(self.path, "keys.npy")
+        if not os.path.exists(keys_path):
+            return [], np.zeros((0, self.model.bert.config.hidden_size), dtype=np.float32)
+        stored = np.load(keys_path)
+        if stored.dtype.kind == "S":
+            # Older caches kept the keys as S20, which drops trailing zero bytes; pad them back
+            keys = [bytes(k).ljust(KEY_BYTES, b"\0") for k in stored]
+        else:
+            keys = [row.tobytes() for row in stored]
+        return keys, np.load(os.path.join(self.path, "embeddings.npy"))
+
+    def _save(self):
+        os.makedirs(self.path, exist_ok=True)
+        # Raw uint8 rows: an S20 array would strip digests that end in a zero byte
+        keys = np.frombuffer(b"".join(self.keys), dtype=np.uint8).reshape(-1, KEY_BYTES)
+        np.save(os.path.join(self.path, "keys.npy"), keys)
+        np.save(os.path.join(self.path, "embeddings.npy"), self.embeddings)
+
+    def _encode(self, texts):
+        out = []
+        with torch.no_grad():
+            for start in range(0, len(texts), self.batch_size):
+                encoding = get_tokenizer()(
+                    texts[start:start + self.batch_size],
+                    truncation=True,
+                    padding=True,
+                    max_length=self.max_len,
+                    return_tensors="pt"
+                )
+                pooled = self.model.bert(**encoding).pooler_output
+                out.append(pooled.float().numpy())
+        return np.concatenate(out)
+
+    def lookup(self, texts):
+        """(len(texts), hidden) float32 array, computing only texts not seen before."""
+        texts = [str(t) for t in texts]
+        keys = [text_key(t) for t in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self.index and key not in missing:
+                missing[key] = text
+        if missing:
+            print(f"Encoding {len(missing)} new responses ({len(self.index)} cached)")
+            self.embeddings = np.concatenate([self.embeddings, self._encode(list(missing.values()))])
+            for key in missing:
+                self.index[key] = len(self.keys)
+                self.keys.append(key)
+            self._save()
+        return self.embeddings[[self.index[k] for k in keys]]
+
+
+def head_inputs(cache, df, extra_features=()):
+    """Features in ADHDClassifier.fc order: pooled embedding, age/100, sex flag, then any extra columns."""
+    features = feature_arrays(df)
+    columns = [cache.lookup(df["response"]), features["age"][:, None], features["sex"][:, None]]
+    columns += [df[name].to_numpy(dtype=np.float32)[:, None] for name in extra_features]
+    return torch.from_numpy(np.concatenate(columns, axis=1).astype(np.float32))
+
+
+def train_head(features, labels, epochs=200, lr=1e-3, dropout=0.3, head=None):
+    """Full-batch AdamW on the cached features; starts from `head` (e.g. the current fc) if given."""
+    head = head or nn.Linear(features.size(1), 1)
+    drop = nn.Dropout(dropout)
+    optimizer = torch.optim.AdamW(head.parameters(), lr=lr)
+    loss_fn = nn.BCEWithLogitsLoss()
+    for _ in range(epochs):
+        head.train()
+        loss = loss_fn(head(drop(features)).view(-1), labels)
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+    print(f"Head trained for {epochs} epochs | Loss: {loss.item():.4f}")
+    return head.eval()
+
+
+def evaluate_head(head, features, labels):
+    with torch.no_grad():
+        probs = torch.sigmoid(head(features).view(-1)).numpy()
+    y, preds = labels.numpy(), (probs > 0.5).astype(np.float32)
+    metrics = {
+        "accuracy": accuracy_score(y, preds),
+        "precision": precision_score(y, preds, zero_division=0),
+        "recall": recall_score(y, preds, zero_division=0),
+        "f1": f1_score(y, preds, zero_division=0),
+        "roc_auc": roc_auc_score(y, probs) if len(set(y)) > 1 else float("nan"),
+    }
+    print("Val " + " | ".join(f"{k}: {v:.4f}" for k, v in metrics.items()))
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="your_training_data.csv")
+    parser.add_argument("--encoder", help="ADHDClassifier state dict to take the frozen encoder from "
+                                          "(default: pretrained BERT)")
+    parser.add_argument("--features", nargs="*", default=[], help="extra numeric CSV columns for the head")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--save", help="write the encoder with the new head as a full ADHDClassifier state dict")
+    args = parser.parse_args()
+    if args.save and args.features:
+        parser.error("--save needs the standard age/sex head (drop --features)")
+
+    model = ADHDClassifier()
+    model_name = PRETRAINED_MODEL
+    if args.encoder:
+        model.load_state_dict(torch.load(args.encoder, map_location="cpu"))
+        model_name = f"{os.path.basename(args.encoder)}-{file_hash(args.encoder)[:12]}"
+    cache = EmbeddingCache(model, model_name, args.cache_dir)
+
+    df = labelled_transcripts(read_transcripts(args.csv), args.csv)
+    train_df, val_df = train_test_split(df, test_size=0.2, random_state=args.seed)
+    train_x, val_x = head_inputs(cache, train_df, args.features), head_inputs(cache, val_df, args.features)
+    train_y = torch.from_numpy(feature_arrays(train_df)["label"])
+    val_y = torch.from_numpy(feature_arrays(val_df)["label"])
+
+    # Without extra features the head has fc's shape, so fine-tuning can start from the encoder's own head
+    start_head = model.fc if args.encoder and not args.features else None
+    head = train_head(train_x, train_y, args.epochs, args.lr, head=start_head)
+    evaluate_head(head, val_x, val_y)
+
+    if args.save:
+        model.fc.load_state_dict(head.state_dict())
+        torch.save(model.state_dict(), args.save)
+        print(f"✅ Model with retrained head saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Export a trained ADHDClassifier state dict to TorchScript, ONNX or safetensors.
+
+Both graphs keep batch and sequence length dynamic. --check runs the exported
+graph next to the eager model on sample inputs of several shapes, fails if the
+logits diverge, and prints a latency comparison.
+
+    python export_model.py --format torchscript --out adhd_model.ts --check
+    python export_model.py --format onnx --out adhd_model.onnx --check
+    python export_model.py --format safetensors --check
+
+Use the result at inference time with ADHD_NN_BACKEND=torchscript|onnx. A safetensors
+copy (memory-mapped on load) is picked up by the default fp32 backend automatically.
+"""
+import argparse
+import sys
+import time
+
+import torch
+
+from adhd_nn_diagnosis_model import (
+    ADHDClassifier, MAX_LEN, OnnxClassifier, load_torchscript_model, load_weights, save_weights, get_tokenizer
+)
+
+SAMPLE_ANSWERS = [
+    "Yes.",
+    "I often lose focus during conversations and find it hard to sit still.",
+    "Not really, I can usually finish what I start unless it is something really boring like paperwork.",
+    "Sometimes",
+]
+INPUT_NAMES = ["input_ids", "attention_mask", "age", "sex"]
+
+
+def sample_inputs(answers):
+    encoding = get_tokenizer()(answers, padding=True, truncation=True, max_length=MAX_LEN, return_tensors="pt")
+    n = len(answers)
+    age = torch.full((n, 1), 0.3)
+    sex = torch.tensor([[float(i % 2)] for i in range(n)])
+    return encoding["input_ids"], encoding["attention_mask"], age, sex
+
+
+def export_torchscript(model, path):
+    with torch.no_grad():
+        traced = torch.jit.trace(model, sample_inputs(SAMPLE_ANSWERS[:2]))
+    traced = torch.jit.freeze(traced)
+    traced.save(path)
+
+
+def export_onnx(model, path):
+    dynamic_axes = {
+        "input_ids": {0: "batch", 1: "sequence"},
+        "attention_mask": {0: "batch", 1: "sequence"},
+        "age": {0: "batch"},
+        "sex": {0: "batch"},
+        "logits": {0: "batch"},
+    }
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            sample_inputs(SAMPLE_ANSWERS[:2]),
+            path,
+            input_names=INPUT_NAMES,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+            dynamo=False
+        )
+
+
+def mean_latency_ms(model, inputs, runs=20):
+    with torch.no_grad():
+        model(*inputs)
+        start = time.perf_counter()
+        for _ in range(runs):
+            model(*inputs)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def check_equivalence(eager, exported, atol=1e-4):
+    """Compare exported vs eager logits on single answers and padded batches; returns True if all match."""
+    cases = [[answer] for answer in SAMPLE_ANSWERS] + [SAMPLE_ANSWERS, SAMPLE_ANSWERS * 4]
+    ok = True
+    print(f"{'batch x seq':<14}{'max |diff|':>12}{'eager ms':>10}{'export ms':>11}")
+    for answers in cases:
+        inputs = sample_inputs(answers)
+        with torch.no_grad():
+            diff = (eager(*inputs) - exported(*inputs)).abs().max().item()
+        ok = ok and diff <= atol
+        shape = f"{inputs[0].size(0)} x {inputs[0].size(1)}"
+        print(f"{shape:<14}{diff:>12.2e}{mean_latency_ms(eager, inputs):>10.2f}"
+              f"{mean_latency_ms(exported, inputs):>11.2f}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="adhd_model.pt", help="trained fp32 state dict")
+    parser.add_argument("--format", choices=["torchscript", "onnx", "safetensors"], default="torchscript")
+    parser.add_argument("--out", help="output path (default adhd_model.ts / .onnx / .safetensors)")
+    parser.add_argument("--threads", type=int, default=0, help="pin intra-op threads for the check")
+    parser.add_argument("--check", action="store_true", help="verify equivalence and compare latency")
+    args = parser.parse_args()
+    out = args.out or {"torchscript": "adhd_model.ts", "onnx": "adhd_model.onnx",
+                       "safetensors": "adhd_model.safetensors"}[args.format]
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    model = ADHDClassifier()
+    model.load_state_dict(torch.load(args.model, map_location="cpu"))
+    model.eval()
+
+    if args.format == "torchscript":
+        export_torchscript(model, out)
+    elif args.format == "onnx":
+        export_onnx(model, out)
+    else:
+        save_weights(model, out)
+    print(f"✅ Exported {args.format} model to {out}")
+
+    if args.check:
+        if args.format == "torchscript":
+            exported = load_torchscript_model(out)
+        elif args.format == "safetensors":
+            start = time.perf_counter()
+            exported = load_weights(out)
+            print(f"Memory-mapped load: {(time.perf_counter() - start) * 1000:.0f} ms")
+        else:
+            exported = OnnxClassifier(out, num_threads=args.threads or None)
+        if not check_equivalence(model, exported):
+            print("❌ Exported model does not match the eager model")
+            sys.exit(1)
+        print("✅ Exported model matches the eager model")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Shared inference server: one ADHDClassifier for every interview station on the box.
+
+The model is loaded once (same backends and ADHD_NN_* settings as
+neural_adhd_guidance). Concurrent requests are queued and a single batching
+thread collects them into micro-batches: it waits at most --window-ms after
+the first request, or until --max-batch answers are pending, then scores
+them all in one padded forward pass and hands each caller its own results.
+
+Listens on localhost HTTP or, on Linux/macOS, a Unix socket:
+
+    python inference_server.py --port 8765
+    python inference_server.py --unix /tmp/adhd_nn.sock
+
+Point the stations at it with ADHD_NN_SERVER=http://127.0.0.1:8765
+(or unix:/tmp/adhd_nn.sock); evaluate_answer_traits then goes through
+InferenceClient instead of loading BERT in every DiagnosisWindow process.
+
+    POST /evaluate  {"items": [[question, answer, age, sex], ...]} -> {"results": [...]}
+    GET  /health    -> {"status": "ok", "requests": ..., "batches": ..., "mean_batch": ...}
+"""
+import argparse
+import http.client
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8765
+
+
+class MicroBatcher:
+    """Collects submitted item lists into batches of up to max_batch answers, scored by score_fn on one thread."""
+
+    def __init__(self, score_fn, max_batch=32, window_ms=10):
+        self.score_fn = score_fn
+        self.max_batch = max_batch
+        self.window = window_ms / 1000.0
+        self.queue = queue.Queue()
+        self.stats = {"requests": 0, "answers": 0, "batches": 0}
+        self._stats_lock = threading.Lock()
+        threading.Thread(target=self._run, name="micro-batcher", daemon=True).start()
+
+    def submit(self, items):
+        """Block until items are scored; returns their results in order."""
+        slot = {"items": items, "done": threading.Event(), "results": None}
+        self.queue.put(slot)
+        slot["done"].wait()
+        return slot["results"]
+
+    def _collect(self):
+        pending = [self.queue.get()]
+        count = len(pending[0]["items"])
+        deadline = time.monotonic() + self.window
+        while count < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                slot = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            pending.append(slot)
+            count += len(slot["items"])
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            items = [item for slot in pending for item in slot["items"]]
+            try:
+                results = self.score_fn(items, batch_size=self.max_batch)
+            except Exception as e:
+                print(f"[NN ERROR]: {e}")
+                results = [{"trait": "UNKNOWN", "completeness": 0.0} for _ in items]
+            start = 0
+            for slot in pending:
+                end = start + len(slot["items"])
+                slot["results"] = results[start:end]
+                slot["done"].set()
+                start = end
+            with self._stats_lock:
+                self.stats["requests"] += len(pending)
+                self.stats["answers"] += len(items)
+                self.stats["batches"] += 1
+
+    def snapshot(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["mean_batch"] = stats["answers"] / max(stats["batches"], 1)
+        return stats
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so a station reuses one connection per answer
+    batcher = None  # set by serve()
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._reply(404, {"error": "not found"})
+        self._reply(200, {"status": "ok", **self.batcher.snapshot()})
+
+    def do_POST(self):
+        if self.path != "/evaluate":
+            return self._reply(404, {"error": "not found"})
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            items = [(str(q), str(a), float(age), str(sex)) for q, a, age, sex in request["items"]]
+        except (ValueError, KeyError, TypeError) as e:
+            return self._reply(400, {"error": f"bad request: {e}"})
+        self._reply(200, {"results": self.batcher.submit(items)})
+
+    def log_message(self, format, *args):
+        # Per-request logging would dominate at interview rates (and Unix peers have no address)
+        pass
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(batcher, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+    InferenceHandler.batcher = batcher
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.remove(unix_path)
+        server = ThreadingUnixHTTPServer(unix_path, InferenceHandler)
+        where = f"unix:{unix_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), InferenceHandler)
+        where = f"http://{host}:{port}"
+    print(f"✅ Serving ADHDClassifier at {where} (max batch {batcher.max_batch}, "
+          f"window {batcher.window * 1000:.0f} ms)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if unix_path and os.path.exists(unix_path):
+            os.remove(unix_path)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class InferenceClient:
+    """
+    Client for the server, addressed as "http://host:port" or "unix:/path/to.sock".
+    Keeps one connection per calling thread and reconnects once if the server dropped it.
+    """
+
+    def __init__(self, address, timeout=30.0):
+        self.address = address
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        if self.address.startswith("unix:"):
+            path = self.address[len("unix:"):]
+            return _UnixHTTPConnection(path[2:] if path.startswith("//") else path, self.timeout)
+        hostport = self.address.split("://", 1)[-1].rstrip("/")
+        return http.client.HTTPConnection(hostport, timeout=self.timeout)
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body else {}
+        for attempt in range(2):
+            conn = getattr(self._local, "conn", None) or self._connect()
+            self._local.conn = conn
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = json.loads(response.read())
+                if response.status != 200:
+                    raise RuntimeError(f"inference server: {data.get('error', response.status)}")
+                return data
+            except (ConnectionError, http.client.HTTPException, OSError):
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+    def evaluate(self, items):
+        """Results for (question, answer, age, sex) tuples, shaped like evaluate_answer_traits."""
+        return self._request("POST", "/evaluate", {"items": [list(item) for item in items]})["results"]
+
+    def health(self):
+        return self._request("GET", "/health")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--max-batch", type=int, default=32, help="answers per forward pass")
+    parser.add_argument("--window-ms", type=float, default=10, help="how long to wait for more requests")
+    parser.add_argument("--backend", default=None, help="override ADHD_NN_BACKEND")
+    args = parser.parse_args()
+
+    import neural_adhd_guidance
+    # The server always scores with its own model, whatever ADHD_NN_SERVER says
+    if not neural_adhd_guidance.reload_model(backend=args.backend):
+        raise SystemExit(1)
+    batcher = MicroBatcher(neural_adhd_guidance.score_answers_local, args.max_batch, args.window_ms)
+    serve(batcher, args.host, args.port, args.unix)
+
+
+if __name__ == "__main__":
+    main()
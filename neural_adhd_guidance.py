@@ -1,46 +1,289 @@
-import torch
-import torch.nn as nn
-from transformers import BertTokenizer, BertModel
-from torch.utils.data import Dataset
-import pandas as pd
-from adhd_nn_diagnosis_model import ADHDClassifier
+import os
+import threading
 
+# torch, transformers and adhd_nn_diagnosis_model are imported inside the functions that
+# need them, so importing this module (e.g. from diagnosis_window) costs next to nothing.
 PRETRAINED_MODEL = "bert-base-uncased"
 MODEL_PATH = "adhd_model.pt"
-tokenizer = BertTokenizer.from_pretrained(PRETRAINED_MODEL)
+MMAP_MODEL_PATH = "adhd_model.safetensors"   # written next to MODEL_PATH by train_model.py
+QUANTIZED_MODEL_PATH = "adhd_model_int8.pt"  # written by quantize_model.py
+TORCHSCRIPT_MODEL_PATH = "adhd_model.ts"     # written by export_model.py
+ONNX_MODEL_PATH = "adhd_model.onnx"          # written by export_model.py
+STUDENT_MODEL_PATH = "adhd_model_student.pt"  # written by distill_model.py
+EARLY_EXIT_MODEL_PATH = "adhd_model_early_exit.pt"  # written by early_exit_model.py
+PRUNED_MODEL_PATH = "adhd_model_pruned.pt"   # chosen level from prune_model.py
 
+# Inference backend: "fp32" (default, eager), "int8" (dynamic-quantized),
+# "torchscript" or "onnx" (exported graphs), "student" (distilled compact model),
+# "early_exit" (stops at the first intermediate layer confident enough),
+# "pruned" (attention heads and FFN neurons removed).
+NN_BACKEND = os.getenv("ADHD_NN_BACKEND", "fp32").lower()
+BACKEND_PATHS = {
+    "fp32": MODEL_PATH,
+    "int8": QUANTIZED_MODEL_PATH,
+    "torchscript": TORCHSCRIPT_MODEL_PATH,
+    "onnx": ONNX_MODEL_PATH,
+    "student": STUDENT_MODEL_PATH,
+    "early_exit": EARLY_EXIT_MODEL_PATH,
+    "pruned": PRUNED_MODEL_PATH,
+}
+# Intra-op threads for inference; 0 keeps the library default
+NN_THREADS = int(os.getenv("ADHD_NN_THREADS", "0"))
+# Confidence an intermediate exit needs before the early_exit backend stops there
+NN_EXIT_THRESHOLD = float(os.getenv("ADHD_NN_EXIT_THRESHOLD", "0.9"))
+# Shared inference server (inference_server.py), e.g. "http://127.0.0.1:8765" or "unix:/tmp/adhd_nn.sock".
+# When set, answers are scored there and this process never loads the model itself.
+NN_SERVER = os.getenv("ADHD_NN_SERVER", "")
+# SQLite score cache for short repeated answers (answer_cache.py); "off" disables it
+NN_CACHE = os.getenv("ADHD_NN_CACHE", "adhd_score_cache.sqlite")
 
-def evaluate_answer_traits(question, answer, age, sex):
-    try:
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        model = ADHDClassifier()
-        model.load_state_dict(torch.load(MODEL_PATH, map_location=device))
-        model.to(device).eval()
-
-        inputs = tokenizer(
-            answer,
-            return_tensors="pt",
-            max_length=128,
-            truncation=True,
-            padding="max_length"
+
+class ModelHolder:
+    """
+    Process-wide holder for the trained ADHDClassifier.
+    Weights are loaded once on first use (or via preload) and shared by all callers.
+    """
+
+    def __init__(self, backend=NN_BACKEND, path=None):
+        self.backend = backend
+        self.path = path
+        self._loaded = None  # (model, device, version), swapped as one reference
+        self._lock = threading.Lock()
+
+    def _load(self):
+        import torch
+        from adhd_nn_diagnosis_model import (
+            ADHDClassifier, load_early_exit_model, load_quantized_model, load_student_model,
+            load_torchscript_model, load_weights, OnnxClassifier
         )
 
-        input_ids = inputs["input_ids"].to(device)
-        attention_mask = inputs["attention_mask"].to(device)
-        age_tensor = torch.tensor([[age / 100.0]], dtype=torch.float).to(device)
-        sex_tensor = torch.tensor([[1.0 if sex.lower() == "male" else 0.0]], dtype=torch.float).to(device)
+        from answer_cache import model_fingerprint
+
+        path = self.resolve_path()
+        # The exit threshold changes scores too, so it is part of the cache version
+        tag = f"early_exit@{NN_EXIT_THRESHOLD}" if self.backend == "early_exit" else self.backend
+        version = model_fingerprint(path, tag)
+        if NN_THREADS:
+            torch.set_num_threads(NN_THREADS)
+
+        if self.backend == "int8":
+            device = torch.device("cpu")
+            model = load_quantized_model(path)
+        elif self.backend == "torchscript":
+            device = torch.device("cpu")
+            model = load_torchscript_model(path)
+        elif self.backend == "onnx":
+            device = torch.device("cpu")
+            model = OnnxClassifier(path, num_threads=NN_THREADS)
+        elif self.backend in ("student", "pruned"):
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            model = load_student_model(path).to(device)
+        elif self.backend == "early_exit":
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            model = load_early_exit_model(path, NN_EXIT_THRESHOLD).to(device)
+        elif path.endswith(".safetensors"):
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            model = load_weights(path, device)
+        else:
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            state_dict = torch.load(path, map_location=device)
+            model = ADHDClassifier()
+            model.load_state_dict(state_dict)
+            model.to(device).eval()
+        self._warm_up(model, device)
+        return model, device, version
+
+    def resolve_path(self):
+        """Weights file the current backend loads from."""
+        if self.backend not in BACKEND_PATHS:
+            raise ValueError(f"Unknown NN backend '{self.backend}' (expected one of {sorted(BACKEND_PATHS)})")
+        path = self.path or BACKEND_PATHS[self.backend]
+        if self.backend == "fp32" and self.path is None and os.path.exists(MMAP_MODEL_PATH):
+            # Prefer the memory-mappable copy unless adhd_model.pt was rewritten after it
+            if not os.path.exists(MODEL_PATH) or os.path.getmtime(MMAP_MODEL_PATH) >= os.path.getmtime(MODEL_PATH):
+                path = MMAP_MODEL_PATH
+        return path
+
+    def _warm_up(self, model, device):
+        import torch
+        from adhd_nn_diagnosis_model import get_tokenizer
+
+        # One dummy pass so the first real answer doesn't pay for lazy kernel init
+        inputs = get_tokenizer()("warm up", return_tensors="pt")
+        with torch.no_grad():
+            model(
+                inputs["input_ids"].to(device),
+                inputs["attention_mask"].to(device),
+                torch.zeros((1, 1), device=device),
+                torch.zeros((1, 1), device=device)
+            )
+
+    def get(self):
+        """Return (model, device), loading the weights on first call."""
+        return self.get_versioned()[:2]
+
+    def get_versioned(self):
+        """(model, device, version), where version fingerprints the weights file the model came from."""
+        if self._loaded is None:
+            with self._lock:
+                if self._loaded is None:
+                    self._loaded = self._load()
+        return self._loaded
+
+    def reload(self, path=None, backend=None):
+        """Reload weights from disk (e.g. after retraining or switching backend) and swap them in."""
+        with self._lock:
+            if backend is not None:
+                self.backend = backend
+                self.path = None
+            if path is not None:
+                self.path = path
+            self._loaded = self._load()
+        return self._loaded[:2]
+
+
+_holder = ModelHolder()
+_client = None
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _server_client():
+    global _client
+    if _client is None:
+        from inference_server import InferenceClient
+        _client = InferenceClient(NN_SERVER)
+    return _client
+
+
+def _score_cache():
+    global _cache
+    if _cache is None and NN_CACHE.lower() not in ("", "0", "off"):
+        with _cache_lock:
+            if _cache is None:
+                from answer_cache import AnswerScoreCache
+                _cache = AnswerScoreCache(NN_CACHE)
+    return _cache
+
+
+def cache_stats():
+    """Hit/miss counts and hit rate of the answer score cache, or None when it is disabled."""
+    cache = _score_cache()
+    return cache.stats() if cache is not None else None
+
+
+def preload_model():
+    """Load and warm the shared model ahead of the first interview answer (or check the server is up)."""
+    try:
+        if NN_SERVER:
+            _server_client().health()
+        else:
+            _holder.get()
+        return True
+    except Exception as e:
+        print(f"[NN ERROR]: {e}")
+        return False
 
-        output = model(input_ids, attention_mask, age_tensor, sex_tensor)
-        score = float(output.squeeze().item())
-        tag = "ADHD" if score >= 0.5 else "NON_ADHD"
 
-        return {"trait": tag, "completeness": score}
+def reload_model(path=None, backend=None):
+    try:
+        _holder.reload(path, backend)
+        return True
     except Exception as e:
         print(f"[NN ERROR]: {e}")
-        return {"trait": "UNKNOWN", "completeness": 0.0}
+        return False
+
+
+def evaluate_answer_traits(question, answer, age, sex):
+    if NN_SERVER:
+        try:
+            return _server_client().evaluate([(question, answer, age, sex)])[0]
+        except Exception as e:
+            print(f"[NN ERROR]: {e}")
+            return {"trait": "UNKNOWN", "completeness": 0.0}
+    # A batch of one is padded to its own length, i.e. not padded at all
+    return score_answers_local([(question, answer, age, sex)])[0]
+
+
+def evaluate_answers_batch(items, batch_size=32):
+    """
+    Score many (question, answer, age, sex) tuples with one forward pass per chunk.
+    Results are returned in input order, with the same shape as evaluate_answer_traits.
+    """
+    items = list(items)
+    if NN_SERVER:
+        try:
+            return _server_client().evaluate(items)
+        except Exception as e:
+            print(f"[NN ERROR]: {e}")
+            return [{"trait": "UNKNOWN", "completeness": 0.0} for _ in items]
+    return score_answers_local(items, batch_size)
+
+
+def score_answers_local(items, batch_size=32):
+    """
+    evaluate_answers_batch on this process's own model, ignoring ADHD_NN_SERVER (used by the server itself).
+    Short answers already in the score cache for the current weights skip the model entirely.
+    """
+    items = list(items)
+    try:
+        from adhd_nn_diagnosis_model import predict_logits
+        model, device, version = _holder.get_versioned()
+    except Exception as e:
+        print(f"[NN ERROR]: {e}")
+        return [{"trait": "UNKNOWN", "completeness": 0.0} for _ in items]
+
+    # Rows are tagged with the version of the loaded weights, so reloading new weights invalidates them
+    scores = [None] * len(items)
+    cache = keys = None
+    try:
+        cache = _score_cache()
+        if cache is not None:
+            keys = [cache.key(answer, age, sex) for _, answer, age, sex in items]
+            scores = cache.get_many(keys, version)
+    except Exception as e:
+        print(f"[NN CACHE ERROR]: {e}")
+        cache = None
+
+    todo = [i for i, score in enumerate(scores) if score is None]
+
+    # Chunked here rather than inside predict_logits, so one failing chunk doesn't lose the others
+    for start in range(0, len(todo), batch_size):
+        chunk = todo[start:start + batch_size]
+        try:
+            output = predict_logits(
+                model,
+                [items[i][1] for i in chunk],
+                [items[i][2] for i in chunk],
+                [items[i][3] for i in chunk],
+                batch_size=len(chunk),
+                device=device
+            )
+            for i, score in zip(chunk, output.tolist()):
+                scores[i] = score
+            if cache is not None:
+                cache.put_many([(keys[i], scores[i]) for i in chunk], version)
+        except Exception as e:
+            print(f"[NN ERROR]: {e}")
+
+    return [_to_result(score) if score is not None else {"trait": "UNKNOWN", "completeness": 0.0}
+            for score in scores]
+
+
+def _to_result(score):
+    tag = "ADHD" if score >= 0.5 else "NON_ADHD"
+    return {"trait": tag, "completeness": score}
 
 # Sample validation function
 def validate_guidance_pipeline():
+    import torch
+    import torch.nn as nn
+    import pandas as pd
+    from torch.utils.data import Dataset
+    from transformers import BertModel
+    from adhd_nn_diagnosis_model import get_tokenizer
+    tokenizer = get_tokenizer()
+
     # Simulate minimal dataframe
     df = pd.DataFrame({
         'response': ["I have trouble focusing", "I never had issues"],
@@ -62,7 +305,6 @@ def validate_guidance_pipeline():
             encoding = tokenizer(
                 item['response'],
                 truncation=True,
-                padding='max_length',
                 max_length= 128,
                 return_tensors='pt'
             )
@@ -109,4 +351,5 @@ def validate_guidance_pipeline():
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-validate_guidance_pipeline()
+if __name__ == "__main__":
+    print(validate_guidance_pipeline())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Typed loader and Parquet cache for the phenotypic dataset.
+
+adhd_NN_data/allSubs_testSet_phenotypic_dx.csv mixes numbers with sentinel
+strings (-999, N/A, pending, blanks) and has a trailing-space header
+("Secondary Dx "). It is parsed once into snake_case columns with pandas
+nullable dtypes (Int8/Int16/Float32/string/boolean, sentinels -> <NA>) and
+written to a Parquet file keyed by a hash of the CSV bytes, so editing the CSV
+rebuilds it automatically. Later loads read only the requested columns.
+
+    python phenotypic_data.py                # build the cache, print dtypes and null counts
+    python phenotypic_data.py --columns participant_id dx adhd_index
+
+join_transcripts() attaches phenotype columns to transcript rows by
+participant ID with one vectorized merge (for multimodal training).
+"""
+import argparse
+import hashlib
+import os
+
+import pandas as pd
+
+from atomic_write import atomic_file
+
+PHENOTYPIC_CSV = os.path.join("adhd_NN_data", "allSubs_testSet_phenotypic_dx.csv")
+CACHE_DIR = ".phenotype_cache"
+SENTINELS = ["-999", "N/A", "pending", ""]
+
+# Raw header (stripped) -> (column name, nullable dtype)
+COLUMNS = {
+    "Disclaimer": ("restricted", "boolean"),     # "This data requires permission to use."
+    "ID": ("participant_id", "string"),
+    "Site": ("site", "Int8"),
+    "Gender": ("gender", "Int8"),                # 1 = male, 0 = female
+    "Age": ("age", "Float32"),
+    "Handedness": ("handedness", "Float32"),     # 1 = right, 0 = left, fractions are laterality scores
+    "DX": ("dx", "Int8"),                        # 0 control, 1 combined, 2 hyperactive/impulsive, 3 inattentive
+    "Secondary Dx": ("secondary_dx", "string"),
+    "ADHD Measure": ("adhd_measure", "Int8"),
+    "ADHD Index": ("adhd_index", "Float32"),    # some sites report half points
+    "Inattentive": ("inattentive", "Float32"),
+    "Hyper/Impulsive": ("hyper_impulsive", "Float32"),
+    "Med Status": ("med_status", "Int8"),
+    "IQ Measure": ("iq_measure", "Int8"),
+    "Verbal IQ": ("verbal_iq", "Int16"),
+    "Performance IQ": ("performance_iq", "Int16"),
+    "Full2 IQ": ("full2_iq", "Int16"),
+    "Full4 IQ": ("full4_iq", "Float32"),      # prorated, one decimal at some sites
+    "QC_Rest_1": ("qc_rest_1", "Int8"),
+    "QC_Rest_2": ("qc_rest_2", "Int8"),
+    "QC_Rest_3": ("qc_rest_3", "Int8"),
+    "QC_Rest_4": ("qc_rest_4", "Int8"),
+    "QC_Anatomical_1": ("qc_anatomical_1", "Int8"),
+    "QC_Anatomical_2": ("qc_anatomical_2", "Int8"),
+}
+
+
+def parse_phenotypes(csv_path=PHENOTYPIC_CSV):
+    """Read the raw CSV into a typed frame: snake_case columns, nullable dtypes, sentinels as <NA>."""
+    raw = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    raw.columns = raw.columns.str.strip()
+    unknown = set(raw.columns) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Unexpected columns in {csv_path}: {sorted(unknown)}")
+
+    df = pd.DataFrame(index=raw.index)
+    for header, (name, dtype) in COLUMNS.items():
+        if header not in raw:
+            continue
+        values = raw[header].str.strip()
+        if name == "restricted":
+            df[name] = (values != "").astype(dtype)
+            continue
+        values = values.mask(values.isin(SENTINELS))
+        if name == "handedness":
+            # A few sites wrote letters instead of the numeric scale
+            values = values.replace({"L": "0", "R": "1"})
+        if dtype == "string":
+            df[name] = values.astype(dtype)
+        else:
+            # A non-integral value in an Int column raises here rather than being truncated
+            df[name] = pd.to_numeric(values).astype(dtype)
+    if df["participant_id"].duplicated().any():
+        raise ValueError(f"Duplicate participant IDs in {csv_path}")
+    return df
+
+
+def cache_path(csv_path=PHENOTYPIC_CSV, cache_dir=CACHE_DIR):
+    digest = hashlib.sha1()
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{digest.hexdigest()[:16]}.parquet")
+
+
+def build_phenotype_cache(csv_path=PHENOTYPIC_CSV, cache_dir=CACHE_DIR, force=False):
+    """Parse csv_path once into Parquet and return the file path (reused if it is already up to date)."""
+    path = cache_path(csv_path, cache_dir)
+    if os.path.exists(path) and not force:
+        return path
+    df = parse_phenotypes(csv_path)
+    with atomic_file(path) as tmp_path:
+        df.to_parquet(tmp_path, engine="pyarrow", index=False)
+    return path
+
+
+def load_phenotypes(columns=None, csv_path=PHENOTYPIC_CSV, cache_dir=CACHE_DIR):
+    """Typed phenotype frame, reading only the given columns from the Parquet cache (built on first use)."""
+    return pd.read_parquet(build_phenotype_cache(csv_path, cache_dir), engine="pyarrow", columns=columns)
+
+
+def join_transcripts(transcripts, phenotypes=None, columns=None, on="participant_id", how="left"):
+    """
+    Transcript rows with phenotype columns attached by participant ID, in transcript order.
+    IDs are compared as stripped strings; unmatched rows get <NA> with how="left".
+    """
+    if phenotypes is None:
+        phenotypes = load_phenotypes(None if columns is None else ["participant_id", *columns])
+    elif columns is not None:
+        phenotypes = phenotypes[["participant_id", *columns]]
+    phenotypes = phenotypes.rename(columns={"participant_id": "_join_id"})
+    # Both sides may already have e.g. "age"; the transcript's own value keeps its name
+    clashes = set(phenotypes.columns) & set(transcripts.columns)
+    phenotypes = phenotypes.rename(columns={c: f"pheno_{c}" for c in clashes})
+
+    keys = transcripts[on].astype("string").str.strip()
+    merged = transcripts.assign(_join_id=keys.to_numpy()).merge(
+        phenotypes.assign(_join_id=phenotypes["_join_id"].astype("string").str.strip()),
+        on="_join_id", how=how, validate="many_to_one"
+    )
+    return merged.drop(columns="_join_id")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=PHENOTYPIC_CSV)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--columns", nargs="+", help="only load these columns")
+    parser.add_argument("--force", action="store_true", help="rebuild even if an up-to-date cache exists")
+    args = parser.parse_args()
+
+    path = build_phenotype_cache(args.csv, args.cache_dir, args.force)
+    df = load_phenotypes(args.columns, args.csv, args.cache_dir)
+    print(f"✅ {args.csv} -> {path} ({len(df)} participants)")
+    print(f"{'column':<18}{'dtype':>10}{'nulls':>8}")
+    for name in df.columns:
+        print(f"{name:<18}{str(df[name].dtype):>10}{int(df[name].isna().sum()):>8}")
+
+
+if __name__ == "__main__":
+    main()
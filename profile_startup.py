@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Import-time profiler for app startup.
+
+Imports everything the launcher needs before the first window appears in a
+fresh interpreter with `python -X importtime`, reports the most expensive
+modules, and exits non-zero if the total exceeds the budget or a heavy module
+(torch, transformers, TTS, cv2, ...) is pulled in eagerly.
+
+    python profile_startup.py --budget 2.5 --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# What launch_adhd_app imports before window.show()
+STARTUP_MODULES = ["launch_adhd_app", "adhd_app_gui"]
+# Must only load on first use, never at startup
+HEAVY_MODULES = ["torch", "transformers", "TTS", "cv2", "speech_recognition", "sounddevice", "pandas", "sklearn"]
+DEFAULT_BUDGET_S = float(os.getenv("ADHD_STARTUP_BUDGET", "3.0"))
+
+
+def profile_imports(modules):
+    """Return [(module, self_us, cumulative_us, depth)] for one fresh interpreter importing modules."""
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # import time:       self [us] |    cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_S, help="seconds (env ADHD_STARTUP_BUDGET)")
+    parser.add_argument("--top", type=int, default=15, help="how many modules to list")
+    parser.add_argument("--modules", nargs="+", default=STARTUP_MODULES)
+    args = parser.parse_args()
+
+    rows = profile_imports(args.modules)
+    total_s = sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1e6
+
+    print(f"{'module':<45}{'self ms':>10}{'cumulative ms':>15}")
+    for name, self_us, cumulative_us, _ in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{name:<45}{self_us / 1000:>10.1f}{cumulative_us / 1000:>15.1f}")
+    print(f"\nTotal import time: {total_s:.2f}s (budget {args.budget:.2f}s)")
+
+    loaded = {name for name, _, _, _ in rows}
+    eager_heavy = [m for m in HEAVY_MODULES if m in loaded]
+    failed = False
+    if eager_heavy:
+        print(f"❌ Heavy modules imported at startup: {', '.join(eager_heavy)}")
+        failed = True
+    if total_s > args.budget:
+        print("❌ Startup import time is over budget")
+        failed = True
+    if not failed:
+        print("✅ Startup import time within budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Structured pruning of a fine-tuned ADHDClassifier.
+
+Attention heads and intermediate FFN neurons are scored with a first-order
+Taylor estimate of how much the loss would change without them (|gradient x
+value| of a head mask, and of each FFN activation) on a sample of training
+batches. For every sparsity level the least important heads (globally, at
+least one kept per layer) and the same fraction of FFN neurons in every layer
+are physically removed, the smaller model is fine-tuned briefly and then
+reported: parameter count, CPU latency per answer and validation F1.
+
+Each level is saved like a distilled student (encoder config + weights; pruned
+heads and the new FFN width live in the config), so evaluate_answer_traits
+loads it with ADHD_NN_BACKEND=pruned once the chosen file is copied to
+adhd_model_pruned.pt.
+
+    python prune_model.py --model adhd_model.pt --csv your_training_data.csv \
+        --sparsity 0.1 0.25 0.4 0.5 --finetune-epochs 1
+"""
+import argparse
+import copy
+import os
+import time
+
+import torch
+import torch.nn as nn
+from transformers.pytorch_utils import prune_linear_layer
+
+from adhd_nn_diagnosis_model import (
+    ADHDClassifier, LEARNING_RATE, batch_to_device, evaluate_model, latency_ms, save_student_model
+)
+from train_model import load_datasets, make_loader
+from transcript_ingest import DATA_DIR, load_transcript_dir
+SPARSITY_LEVELS = [0.1, 0.25, 0.4, 0.5]
+
+
+def importance_scores(model, loader, device, max_batches=50):
+    """(head scores [layers, heads], FFN scores [layers, intermediate]) accumulated over up to max_batches."""
+    config = model.bert.config
+    layers = model.bert.encoder.layer
+    head_mask = torch.ones(config.num_hidden_layers, config.num_attention_heads, device=device, requires_grad=True)
+    ffn_scores = torch.zeros(config.num_hidden_layers, config.intermediate_size, device=device)
+    activations = {}
+
+    def keep_activation(i):
+        def hook(module, inputs, output):
+            output.retain_grad()
+            activations[i] = output
+        return hook
+
+    handles = [layer.intermediate.register_forward_hook(keep_activation(i)) for i, layer in enumerate(layers)]
+    loss_fn = nn.BCEWithLogitsLoss()
+    model.eval()  # no dropout noise in the scores
+    try:
+        for n, batch in enumerate(loader):
+            if n >= max_batches:
+                break
+            ids, mask, age, sex, labels = batch_to_device(batch, device)
+            pooled = model.bert(input_ids=ids, attention_mask=mask, head_mask=head_mask).pooler_output
+            logits = model.fc(torch.cat((pooled, age, sex), dim=1)).view(-1)
+            loss = loss_fn(logits, labels.view(-1))
+            model.zero_grad()
+            loss.backward()
+            for i, act in activations.items():
+                ffn_scores[i] += (act * act.grad).sum(dim=(0, 1)).abs().detach()
+    finally:
+        for handle in handles:
+            handle.remove()
+        model.zero_grad(set_to_none=True)
+    head_scores = head_mask.grad.abs()
+    # Per-layer normalisation so layers with large gradients don't dominate the global head ranking
+    head_scores = head_scores / head_scores.norm(dim=1, keepdim=True).clamp(min=1e-12)
+    return head_scores.cpu(), ffn_scores.cpu()
+
+
+def prune(model, head_scores, ffn_scores, sparsity):
+    """Remove the given fraction of heads and FFN neurons in place; returns the model."""
+    num_layers, num_heads = head_scores.shape
+    order = head_scores.view(-1).argsort()
+    to_prune = {layer: [] for layer in range(num_layers)}
+    for flat in order[:int(sparsity * num_layers * num_heads)].tolist():
+        layer, head = divmod(flat, num_heads)
+        if len(to_prune[layer]) < num_heads - 1:
+            to_prune[layer].append(head)
+    model.bert.prune_heads({layer: heads for layer, heads in to_prune.items() if heads})
+
+    keep = ffn_scores.size(1) - int(sparsity * ffn_scores.size(1))
+    for i, layer in enumerate(model.bert.encoder.layer):
+        index = ffn_scores[i].topk(keep).indices.sort().values
+        layer.intermediate.dense = prune_linear_layer(layer.intermediate.dense, index, dim=0)
+        layer.output.dense = prune_linear_layer(layer.output.dense, index, dim=1)
+    # Same width in every layer, so a plain BertConfig can rebuild the pruned encoder
+    model.bert.config.intermediate_size = keep
+    return model
+
+
+def finetune(model, loader, device, epochs=1, lr=LEARNING_RATE):
+    optimizer = torch.optim.AdamW(model.parameters(), lr=lr)
+    loss_fn = nn.BCEWithLogitsLoss()
+    for _ in range(epochs):
+        model.train()
+        for batch in loader:
+            ids, mask, age, sex, labels = batch_to_device(batch, device)
+            loss = loss_fn(model(ids, mask, age, sex).view(-1), labels.view(-1))
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+    return model.eval()
+
+
+def measure(model, val_loader, transcripts, device):
+    """(parameters in millions, CPU ms per answer, validation F1)."""
+    f1 = evaluate_model(model, val_loader)["f1"]
+    ms = latency_ms(model.to("cpu"), transcripts)
+    model.to(device)
+    return sum(p.numel() for p in model.parameters()) / 1e6, ms, f1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="adhd_model.pt", help="trained ADHDClassifier state dict")
+    parser.add_argument("--csv", default="your_training_data.csv")
+    parser.add_argument("--sparsity", type=float, nargs="+", default=SPARSITY_LEVELS)
+    parser.add_argument("--score-batches", type=int, default=50, help="training batches used for importance scores")
+    parser.add_argument("--finetune-epochs", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--out", default="adhd_model_pruned.pt", help="levels are saved as <stem>_<percent>.pt")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="transcript CSVs for the latency measurement")
+    parser.add_argument("--seed", type=int, default=0, help="train/val split seed")
+    args = parser.parse_args()
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model = ADHDClassifier()
+    model.load_state_dict(torch.load(args.model, map_location="cpu"))
+    model.to(device).eval()
+
+    train_ds, val_ds = load_datasets(args.csv, seed=args.seed)
+    train_loader = make_loader(train_ds, batch_size=args.batch_size, shuffle=True)
+    val_loader = make_loader(val_ds, batch_size=args.batch_size)
+    transcripts = load_transcript_dir(args.data_dir)
+
+    start = time.perf_counter()
+    head_scores, ffn_scores = importance_scores(model, train_loader, device, args.score_batches)
+    print(f"Importance scores from {min(args.score_batches, len(train_loader))} batches"
+          f" in {time.perf_counter() - start:.1f}s")
+
+    rows = [("dense", *measure(model, val_loader, transcripts, device), "-")]
+    stem = os.path.splitext(args.out)[0]
+    for sparsity in sorted(args.sparsity):
+        pruned = prune(copy.deepcopy(model), head_scores, ffn_scores, sparsity)
+        if args.finetune_epochs:
+            finetune(pruned, train_loader, device, args.finetune_epochs)
+        path = f"{stem}_{round(sparsity * 100)}.pt"
+        save_student_model(pruned, path)
+        rows.append((f"{sparsity:.0%}", *measure(pruned, val_loader, transcripts, device), path))
+
+    print(f"\n{'sparsity':<10}{'params (M)':>12}{'ms/answer':>11}{'val F1':>9}  saved as")
+    for name, params, ms, f1, path in rows:
+        print(f"{name:<10}{params:>12.1f}{ms:>11.1f}{f1:>9.4f}  {path}")
+    print("\nCopy the chosen level to adhd_model_pruned.pt and run with ADHD_NN_BACKEND=pruned")
+
+
+if __name__ == "__main__":
+    main()
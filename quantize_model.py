@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Dynamic int8 quantization for ADHDClassifier.
+
+Writes an int8 artifact next to the fp32 weights and, given a held-out CSV
+(response, age, sex[, label]; any label spelling transcript_ingest accepts),
+prints a parity report against the fp32 model.
+
+    python quantize_model.py --model adhd_model.pt --out adhd_model_int8.pt \
+        --parity adhd_NN_data/cleaned_adhd_transcripts.csv
+
+Use it at inference time with ADHD_NN_BACKEND=int8.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import torch
+
+from adhd_nn_diagnosis_model import (
+    ADHDClassifier, quantize_dynamic_int8, load_quantized_model, predict_logits, save_quantized_model
+)
+from transcript_ingest import feature_arrays, read_transcripts
+
+
+
+def timed_logits(model, df):
+    start = time.perf_counter()
+    logits = predict_logits(model, df["response"], df["age"], df["sex"], batch_size=1)
+    return logits, (time.perf_counter() - start) / max(len(df), 1)
+
+
+def parity_report(fp32_model, int8_model, csv_path, fp32_path, int8_path):
+    df = read_transcripts(csv_path)
+    # Warm both models so the first timed row isn't an outlier
+    predict_logits(fp32_model, df["response"][:1], df["age"][:1], df["sex"][:1])
+    predict_logits(int8_model, df["response"][:1], df["age"][:1], df["sex"][:1])
+
+    fp32_logits, fp32_s = timed_logits(fp32_model, df)
+    int8_logits, int8_s = timed_logits(int8_model, df)
+    fp32_preds = torch.sigmoid(fp32_logits) > 0.5
+    int8_preds = torch.sigmoid(int8_logits) > 0.5
+    diff = (fp32_logits - int8_logits).abs()
+
+    print(f"Parity on {csv_path} ({len(df)} rows)")
+    print(f"  logit |diff|   max {diff.max().item():.4f} | mean {diff.mean().item():.4f}")
+    print(f"  label agreement {(fp32_preds == int8_preds).float().mean().item():.2%}")
+
+    labels = feature_arrays(df)["label"]
+    if not np.isnan(labels).any():
+        truth = torch.from_numpy(labels).bool()
+        print(f"  accuracy        fp32 {(fp32_preds == truth).float().mean().item():.2%}"
+              f" | int8 {(int8_preds == truth).float().mean().item():.2%}")
+
+    print(f"  latency/row     fp32 {fp32_s * 1000:.1f} ms | int8 {int8_s * 1000:.1f} ms")
+    print(f"  on-disk size    fp32 {os.path.getsize(fp32_path) / 2**20:.1f} MB"
+          f" | int8 {os.path.getsize(int8_path) / 2**20:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="adhd_model.pt", help="trained fp32 state dict")
+    parser.add_argument("--out", default=None,
+                        help="where to write the int8 model (weights + encoder config); default adhd_model_int8.pt next to --model")
+    parser.add_argument("--parity", metavar="CSV", help="held-out CSV for the fp32 vs int8 parity report")
+    args = parser.parse_args()
+    out = args.out or os.path.join(os.path.dirname(args.model), "adhd_model_int8.pt")
+
+    fp32_model = ADHDClassifier()
+    fp32_model.load_state_dict(torch.load(args.model, map_location="cpu"))
+    fp32_model.eval()
+
+    save_quantized_model(quantize_dynamic_int8(fp32_model), out)
+    print(f"✅ Quantized model saved to {out}")
+
+    if args.parity:
+        # Reload from disk so the report covers exactly what inference will load
+        parity_report(fp32_model, load_quantized_model(out), args.parity, args.model, out)
+
+
+if __name__ == "__main__":
+    main()
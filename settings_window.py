@@ -8,7 +8,6 @@ from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel, QPushButton,
     QComboBox, QHBoxLayout, QProgressBar
 )
-from diagnosis_window import DiagnosisWindow
 import pyaudio
 
 
@@ -154,6 +153,8 @@ class SettingsWindow(QWidget):
         selected_camera = self.video_combo.currentIndex()
         print(f"[DEBUG] Starting Diagnosis with Mic Index {selected_mic} and Camera Index {selected_camera}")
 
+        from diagnosis_window import DiagnosisWindow  # heavy (TTS, speech recognition); load on demand
+
         self.diagnosis = DiagnosisWindow(mic_index=selected_mic, camera_index=selected_camera)
         self.diagnosis.show()
         self.close()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Out-of-core streaming of transcript rows from large CSV / JSONL files.
+
+Files are read in fixed-size chunks (pandas chunksize), so memory stays flat
+however large the files are: one chunk per reader plus a bounded shuffle
+buffer. Every chunk goes through normalize_transcripts, so label spellings,
+sexes and ages are read exactly as in read_transcripts. Each participant
+lands on the train or validation side by a stable hash of participant_id, so
+the split is the same on every run and machine and a participant's answers
+never straddle it (files without participant IDs split per response).
+Chunks are dealt round-robin to readers (DataLoader workers x distributed
+ranks), so every reader parses only its own share of the file.
+
+Rows come out as (text, age, sex, label) like TextInterviewDataset, ready for
+TokenizingCollator. Use via train_model.py --pipeline stream, or check a file:
+
+    python stream_dataset.py interview_logs/*.jsonl --val-fraction 0.2
+"""
+import argparse
+import random
+
+import pandas as pd
+import torch
+import torch.distributed as dist
+from torch.utils.data import IterableDataset, get_worker_info
+
+from adhd_nn_diagnosis_model import MAX_LEN, peak_memory_mb
+from transcript_ingest import feature_arrays, normalize_transcripts
+
+COLUMNS = ["participant_id", "question_id", "response", "age", "sex", "label"]
+HASH_BUCKETS = 10000
+
+
+def read_chunks(path, chunksize):
+    """DataFrame chunks of a .csv or .jsonl/.json-lines file."""
+    if path.endswith((".jsonl", ".json")):
+        return pd.read_json(path, lines=True, chunksize=chunksize, dtype={"participant_id": str})
+    return pd.read_csv(path, chunksize=chunksize, usecols=lambda c: c in COLUMNS, dtype={"participant_id": str})
+
+
+def validation_mask(participant_ids, val_fraction):
+    """True for rows whose participant hashes into the validation share (stable across runs and processes)."""
+    hashes = pd.util.hash_pandas_object(participant_ids.astype(str), index=False).to_numpy()
+    return (hashes % HASH_BUCKETS) < int(val_fraction * HASH_BUCKETS)
+
+
+class StreamingTranscriptDataset(IterableDataset):
+    """
+    Iterable dataset over one or more transcript files.
+    split is "train", "val" or "all"; shuffle_buffer=0 keeps file order (use it for validation).
+    shard_ranks=False gives every distributed rank the full split (e.g. for rank-0-only evaluation).
+    """
+    def __init__(self, paths, split="train", val_fraction=0.2, chunksize=10000, shuffle_buffer=10000,
+                 seed=0, max_len=MAX_LEN, shard_ranks=True):
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.split = split
+        self.val_fraction = val_fraction
+        self.chunksize = chunksize
+        self.shuffle_buffer = shuffle_buffer
+        self.seed = seed
+        self.max_len = max_len
+        self.shard_ranks = shard_ranks
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        """Reshuffle differently each epoch (same call as DistributedSampler.set_epoch)."""
+        self.epoch = epoch
+
+    def _reader(self):
+        """(reader index, reader count) across DataLoader workers and distributed ranks."""
+        worker = get_worker_info()
+        worker_id, num_workers = (worker.id, worker.num_workers) if worker else (0, 1)
+        sharded = self.shard_ranks and dist.is_initialized()
+        rank, world_size = (dist.get_rank(), dist.get_world_size()) if sharded else (0, 1)
+        return rank * num_workers + worker_id, world_size * num_workers
+
+    def _rows(self):
+        reader, num_readers = self._reader()
+        chunk_index = 0
+        for path in self.paths:
+            for chunk in read_chunks(path, self.chunksize):
+                chunk_index += 1
+                if (chunk_index - 1) % num_readers != reader:
+                    continue
+                # Unlabelled rows come back with an <NA> label and can't be trained on, as in labelled_transcripts
+                chunk = normalize_transcripts(chunk).dropna(subset=["label"])
+                if self.split != "all":
+                    keys = chunk["participant_id"].fillna("response:" + chunk["response"])
+                    in_val = validation_mask(keys, self.val_fraction)
+                    chunk = chunk[in_val if self.split == "val" else ~in_val]
+                if chunk.empty:
+                    continue
+                texts = chunk["response"].tolist()
+                features = feature_arrays(chunk)
+                yield from zip(texts, features["age"], features["sex"], features["label"])
+
+    def __iter__(self):
+        rows = self._rows()
+        if not self.shuffle_buffer:
+            yield from rows
+            return
+        # Reservoir-style buffer: fill, then emit a random slot and refill it with the next row
+        reader, _ = self._reader()
+        rng = random.Random(f"{self.seed}-{self.epoch}-{reader}")
+        buffer = []
+        for row in rows:
+            if len(buffer) < self.shuffle_buffer:
+                buffer.append(row)
+                continue
+            i = rng.randrange(len(buffer))
+            yield buffer[i]
+            buffer[i] = row
+        rng.shuffle(buffer)
+        yield from buffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--val-fraction", type=float, default=0.2)
+    parser.add_argument("--chunksize", type=int, default=10000)
+    args = parser.parse_args()
+
+    for split in ("train", "val"):
+        dataset = StreamingTranscriptDataset(args.paths, split, args.val_fraction, args.chunksize, shuffle_buffer=0)
+        rows = positive = 0
+        for _, _, _, label in dataset:
+            rows += 1
+            positive += label
+        print(f"{split:<6}{rows:>10} rows | {positive / max(rows, 1):.1%} positive")
+    print(f"Peak RSS: {peak_memory_mb(torch.device('cpu')):.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Parallel hyperparameter sweep for ADHDClassifier.
+
+Every combination of the given learning rates, epoch counts, dropouts and
+MAX_LEN values (or a random sample of them with --trials) is trained with
+train_model.train() in a process pool, all on the same train/val split.
+Each worker gets a bounded torch thread count so the pool doesn't
+oversubscribe the machine. After every epoch a trial reports its validation
+metric; from --min-epochs on, a trial whose metric is below the median of the
+other trials at the same epoch is pruned (median stopping rule). Results are
+written to a CSV sorted by F1, then ROC AUC.
+
+    python sweep_model.py --csv your_training_data.csv --lr 1e-5 2e-5 5e-5 \
+        --dropout 0.1 0.3 --max-len 64 128 --epochs 4 --parallel 4
+"""
+import argparse
+import itertools
+import multiprocessing as mp
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from adhd_nn_diagnosis_model import DROPOUT, LEARNING_RATE, MAX_LEN
+
+PRUNE_METRICS = ["f1", "roc_auc", "accuracy"]
+
+
+def make_grid(lrs, epochs, dropouts, max_lens, trials=None, seed=0):
+    grid = [
+        {"lr": lr, "epochs": e, "dropout": d, "max_len": m}
+        for lr, e, d, m in itertools.product(lrs, epochs, dropouts, max_lens)
+    ]
+    if trials and trials < len(grid):
+        grid = random.Random(seed).sample(grid, trials)
+    return grid
+
+
+class MedianPruner:
+    """
+    Median stopping rule over a history shared by all workers (a Manager dict of
+    epoch -> list of metric values). A trial is pruned once it is past min_epochs and
+    below the median of at least min_trials other trials' values at the same epoch.
+    """
+    def __init__(self, history, lock, metric="f1", min_epochs=1, min_trials=3):
+        self.history = history
+        self.lock = lock
+        self.metric = metric
+        self.min_epochs = min_epochs
+        self.min_trials = min_trials
+
+    def __call__(self, epoch, metrics):
+        value = metrics[self.metric]
+        with self.lock:
+            others = list(self.history.get(epoch, []))
+            # Manager dicts only see updates on reassignment
+            self.history[epoch] = others + [value]
+        if epoch + 1 < self.min_epochs or len(others) < self.min_trials:
+            return False
+        return value < statistics.median(others)
+
+
+def _init_worker(threads):
+    import torch
+    torch.set_num_threads(threads)
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+def run_trial(trial_id, params, train_args, pruner):
+    from train_model import train
+
+    start = time.perf_counter()
+    summary = train(save_path=None, seed=0, on_epoch_end=pruner, **params, **train_args)
+    return {
+        "trial": trial_id,
+        **params,
+        **{name: summary["metrics"].get(name, 0.0) for name in ("accuracy", "precision", "recall", "f1", "roc_auc")},
+        "epochs_run": len(summary["epoch_seconds"]),
+        "pruned": summary["pruned"],
+        "minutes": (time.perf_counter() - start) / 60,
+    }
+
+
+def sweep(grid, train_args, parallel=2, threads=None, metric="f1", min_epochs=1, min_trials=3):
+    """Run every config in grid and return a results DataFrame sorted best-first."""
+    threads = threads or max(1, (os.cpu_count() or 1) // parallel)
+
+    if train_args.get("pipeline", "cache") == "cache":
+        # Build each token cache once up front so workers don't race on it
+        from token_cache import build_token_cache
+        for max_len in sorted({p["max_len"] for p in grid}):
+            build_token_cache(train_args["csv_path"], max_len=max_len)
+
+    # Workers are spawned, not forked: forking after torch has started its thread pools can hang
+    context = mp.get_context("spawn")
+    rows = []
+    with context.Manager() as manager:
+        pruner = MedianPruner(manager.dict(), manager.Lock(), metric, min_epochs, min_trials)
+        with ProcessPoolExecutor(parallel, mp_context=context, initializer=_init_worker, initargs=(threads,)) as pool:
+            futures = {pool.submit(run_trial, i, params, train_args, pruner): i for i, params in enumerate(grid)}
+            for future in as_completed(futures):
+                try:
+                    row = future.result()
+                except Exception as e:
+                    print(f"❌ Trial {futures[future]} failed: {e}")
+                    continue
+                rows.append(row)
+                status = "pruned" if row["pruned"] else "done"
+                print(f"[{len(rows)}/{len(grid)}] trial {row['trial']} {status} | lr={row['lr']:g} "
+                      f"dropout={row['dropout']:g} max_len={row['max_len']} | F1 {row['f1']:.4f} AUC {row['roc_auc']:.4f}")
+
+    results = pd.DataFrame(rows)
+    if not results.empty:
+        results = results.sort_values(["f1", "roc_auc"], ascending=False).reset_index(drop=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="your_training_data.csv")
+    parser.add_argument("--pipeline", choices=["cache", "fast", "row"], default="cache")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--lr", type=float, nargs="+", default=[LEARNING_RATE])
+    parser.add_argument("--epochs", type=int, nargs="+", default=[3])
+    parser.add_argument("--dropout", type=float, nargs="+", default=[DROPOUT])
+    parser.add_argument("--max-len", type=int, nargs="+", default=[MAX_LEN])
+    parser.add_argument("--trials", type=int, default=None, help="random sample of this many configs from the grid")
+    parser.add_argument("--parallel", type=int, default=2, help="trials trained at the same time")
+    parser.add_argument("--threads", type=int, default=None, help="torch threads per trial (default: cores / parallel)")
+    parser.add_argument("--metric", choices=PRUNE_METRICS, default="f1", help="validation metric used for pruning")
+    parser.add_argument("--min-epochs", type=int, default=1, help="never prune before this many epochs")
+    parser.add_argument("--min-trials", type=int, default=3, help="reports needed at an epoch before pruning")
+    parser.add_argument("--out", default="sweep_results.csv")
+    args = parser.parse_args()
+
+    grid = make_grid(args.lr, args.epochs, args.dropout, args.max_len, args.trials)
+    train_args = {"csv_path": args.csv, "pipeline": args.pipeline, "batch_size": args.batch_size}
+    print(f"Sweeping {len(grid)} configs, {args.parallel} at a time")
+    results = sweep(grid, train_args, args.parallel, args.threads, args.metric, args.min_epochs, args.min_trials)
+
+    if results.empty:
+        print("❌ No trial finished")
+        return
+    results.to_csv(args.out, index=False)
+    print()
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    print(f"\n✅ Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
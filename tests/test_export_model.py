@@ -0,0 +1,55 @@
+"""
+Exported graphs (TorchScript, ONNX, safetensors) must give the eager model's logits.
+
+Runs offline on a tiny randomly initialised ADHDClassifier with a stand-in
+WordPiece vocab, so no bert-base download is needed.
+"""
+import re
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+import adhd_nn_diagnosis_model  # noqa: E402
+import export_model  # noqa: E402
+from adhd_nn_diagnosis_model import (  # noqa: E402
+    ADHDClassifier, OnnxClassifier, load_torchscript_model, load_weights, save_weights
+)
+
+
+@pytest.fixture(scope="module")
+def model(tmp_path_factory):
+    work_dir = tmp_path_factory.mktemp("tokenizer")
+    words = sorted({w for a in export_model.SAMPLE_ANSWERS for w in re.findall(r"\w+|[^\w\s]", a.lower())})
+    vocab_path = work_dir / "vocab.txt"
+    vocab_path.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words))
+    original = adhd_nn_diagnosis_model._tokenizer
+    adhd_nn_diagnosis_model._tokenizer = transformers.BertTokenizerFast(vocab_file=str(vocab_path))
+
+    torch.manual_seed(0)
+    config = transformers.BertConfig(vocab_size=len(words) + 5, hidden_size=64, num_hidden_layers=2,
+                                     num_attention_heads=4, intermediate_size=128)
+    yield ADHDClassifier(bert_config=config).eval()
+    adhd_nn_diagnosis_model._tokenizer = original
+
+
+def test_torchscript_matches_eager(model, tmp_path):
+    path = str(tmp_path / "model.ts")
+    export_model.export_torchscript(model, path)
+    assert export_model.check_equivalence(model, load_torchscript_model(path))
+
+
+def test_onnx_matches_eager(model, tmp_path):
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    path = str(tmp_path / "model.onnx")
+    export_model.export_onnx(model, path)
+    assert export_model.check_equivalence(model, OnnxClassifier(path))
+
+
+def test_safetensors_matches_eager(model, tmp_path):
+    pytest.importorskip("safetensors")
+    path = str(tmp_path / "model.safetensors")
+    save_weights(model, path)
+    assert export_model.check_equivalence(model, load_weights(path))
@@ -0,0 +1,38 @@
+"""threshold_sweep must match sklearn's metrics with predictions prob > threshold."""
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+metrics = pytest.importorskip("sklearn.metrics")
+
+from adhd_nn_diagnosis_model import threshold_sweep  # noqa: E402
+
+THRESHOLDS = [0.0, 0.1, 0.25, 0.5, 0.7, 0.9, 1.0]
+
+
+def check_against_sklearn(probs, labels):
+    sweep = threshold_sweep(torch.tensor(probs), torch.tensor(labels), torch.tensor(THRESHOLDS))
+    for i, t in enumerate(THRESHOLDS):
+        preds = [float(p > t) for p in probs]
+        assert sweep["precision"][i].item() == pytest.approx(metrics.precision_score(labels, preds, zero_division=0))
+        assert sweep["recall"][i].item() == pytest.approx(metrics.recall_score(labels, preds, zero_division=0))
+        assert sweep["f1"][i].item() == pytest.approx(metrics.f1_score(labels, preds, zero_division=0))
+        assert sweep["accuracy"][i].item() == pytest.approx(metrics.accuracy_score(labels, preds))
+
+
+def test_random_scores():
+    generator = torch.Generator().manual_seed(0)
+    probs = torch.rand(200, generator=generator).tolist()
+    labels = (torch.rand(200, generator=generator) < 0.4).float().tolist()
+    check_against_sklearn(probs, labels)
+
+
+def test_ties_and_scores_on_thresholds():
+    # Repeated probabilities with mixed labels, several of them exactly on a threshold
+    probs = [0.5, 0.5, 0.5, 0.25, 0.25, 0.9, 0.9, 0.1, 0.7, 0.7, 0.0, 1.0]
+    labels = [1.0, 0.0, 1.0, 0.0, 1.0, 1.0, 0.0, 0.0, 1.0, 1.0, 0.0, 1.0]
+    check_against_sklearn(probs, labels)
+
+
+def test_all_negative():
+    check_against_sklearn([0.05, 0.3, 0.5, 0.5, 0.95], [0.0] * 5)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Pre-tokenized, memory-mapped training data.
+
+A transcript CSV (or a transcript_ingest.py table) is tokenized once into
+compact numpy arrays (input ids, attention masks, lengths, age, sex, label). The arrays go into a cache
+directory keyed by tokenizer name, MAX_LEN and a hash of the CSV bytes, so
+editing the CSV or changing the tokenizer builds a fresh cache automatically.
+Training then memory-maps the arrays and every epoch is plain array slicing.
+
+    python token_cache.py adhd_NN_data/cleaned_adhd_transcripts.csv
+"""
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+from adhd_nn_diagnosis_model import MAX_LEN, PRETRAINED_MODEL, get_tokenizer
+from atomic_write import atomic_dir
+from transcript_ingest import feature_arrays, labelled_transcripts, read_transcripts
+
+CACHE_DIR = ".token_cache"
+ARRAYS = ["input_ids", "attention_mask", "lengths", "age", "sex", "label"]
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(csv_path, tokenizer_name=None, max_len=MAX_LEN):
+    tokenizer_name = tokenizer_name or PRETRAINED_MODEL
+    raw = f"{tokenizer_name}|{max_len}|{file_hash(csv_path)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def build_token_cache(csv_path, cache_dir=CACHE_DIR, max_len=MAX_LEN, force=False):
+    """Tokenize csv_path once and return the cache directory (reused if it is already up to date)."""
+    key = cache_key(csv_path, max_len=max_len)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    path = os.path.join(cache_dir, f"{stem}-{key}")
+    if os.path.exists(os.path.join(path, "meta.json")) and not force:
+        return path
+
+    df = labelled_transcripts(read_transcripts(csv_path), csv_path)
+    encoding = get_tokenizer()(
+        df["response"].astype(str).tolist(),
+        truncation=True,
+        padding="max_length",
+        max_length=max_len,
+        return_attention_mask=True
+    )
+    input_ids = np.asarray(encoding["input_ids"], dtype=np.int32)
+    attention_mask = np.asarray(encoding["attention_mask"], dtype=np.uint8)
+    arrays = {
+        "input_ids": input_ids,
+        "attention_mask": attention_mask,
+        "lengths": attention_mask.sum(axis=1).astype(np.int16),
+        **{name: column[:, None] for name, column in feature_arrays(df).items()},
+    }
+
+    # Ranks on a node without shared storage may build the same cache at once; the first one published wins
+    with atomic_dir(path, replace=force or not os.path.exists(os.path.join(path, "meta.json"))) as tmp_path:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+        with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+            json.dump({
+                "csv": os.path.abspath(csv_path),
+                "tokenizer": PRETRAINED_MODEL,
+                "max_len": max_len,
+                "rows": len(df)
+            }, f, indent=2)
+    return path
+
+
+class CachedTokenDataset(Dataset):
+    """
+    Map-style dataset over a token cache. Rows come back trimmed to their real length,
+    so it plugs into collate_batch / LengthBucketSampler like ADHDInterviewDataset.
+    """
+    def __init__(self, cache_path, indices=None):
+        self.arrays = {name: np.load(os.path.join(cache_path, f"{name}.npy"), mmap_mode="r") for name in ARRAYS}
+        total = len(self.arrays["lengths"])
+        self.indices = np.arange(total) if indices is None else np.asarray(indices)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        row = self.indices[index]
+        n = int(self.arrays["lengths"][row])
+        return {
+            "input_ids": torch.from_numpy(self.arrays["input_ids"][row, :n].astype(np.int64)),
+            "attention_mask": torch.from_numpy(self.arrays["attention_mask"][row, :n].astype(np.int64)),
+            "age": torch.from_numpy(np.array(self.arrays["age"][row])),
+            "sex": torch.from_numpy(np.array(self.arrays["sex"][row])),
+            "label": torch.from_numpy(np.array(self.arrays["label"][row]))
+        }
+
+    def lengths(self):
+        return self.arrays["lengths"][self.indices].tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", nargs="+")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--force", action="store_true", help="rebuild even if an up-to-date cache exists")
+    args = parser.parse_args()
+    for csv_path in args.csv:
+        print(f"✅ {csv_path} -> {build_token_cache(csv_path, args.cache_dir, force=args.force)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,392 @@
+import argparse
+import contextlib
+import os
+import random
+import time
+import numpy as np
 import torch
 import torch.nn as nn
-import pandas as pd
-from torch.utils.data import DataLoader, Dataset
-from transformers import BertTokenizer, BertModel
+import torch.distributed as dist
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import DataLoader, Dataset, DistributedSampler, IterableDataset
 from sklearn.model_selection import train_test_split
-from adhd_nn_diagnosis_model import ADHDClassifier
-
-tokenizer = BertTokenizer.from_pretrained("bert-base-uncased")
+from adhd_nn_diagnosis_model import (
+    ADHDClassifier, collate_batch, get_tokenizer, token_lengths, LengthBucketSampler,
+    autocast_context, evaluate_model, PeakMemoryMonitor, precision_report, DROPOUT, LEARNING_RATE, MAX_LEN,
+    save_weights, load_weights, save_training_checkpoint, load_training_checkpoint, read_training_checkpoint, threshold_report
+)
+from token_cache import build_token_cache, CachedTokenDataset
+from stream_dataset import StreamingTranscriptDataset
+from transcript_ingest import feature_arrays, labelled_transcripts, read_transcripts
 
 class InterviewDataset(Dataset):
-    def __init__(self, df):
-        self.data = df
+    def __init__(self, df, max_len=MAX_LEN):
+        self.max_len = max_len
+        self.texts = df["response"].astype(str).tolist()
+        features = feature_arrays(df)
+        self.ages = features["age"][:, None]
+        self.sexes = features["sex"][:, None]
+        self.labels = features["label"][:, None]
 
     def __getitem__(self, idx):
-        row = self.data.iloc[idx]
-        encoding = tokenizer(
-            row["response"],
+        encoding = get_tokenizer()(
+            self.texts[idx],
             truncation=True,
-            padding="max_length",
-            max_length=128,
+            max_length=self.max_len,
             return_tensors="pt"
         )
-        age = torch.tensor([row["age"] / 100.0])
-        sex = torch.tensor([1.0 if row["sex"] == "male" else 0.0])
-        label = torch.tensor([row["label"]], dtype=torch.float)
         return {
             "input_ids": encoding["input_ids"].squeeze(0),
             "attention_mask": encoding["attention_mask"].squeeze(0),
-            "age": age,
-            "sex": sex,
-            "label": label
+            "age": torch.from_numpy(self.ages[idx]),
+            "sex": torch.from_numpy(self.sexes[idx]),
+            "label": torch.from_numpy(self.labels[idx])
         }
 
     def __len__(self):
-        return len(self.data)
+        return len(self.texts)
+
+    def lengths(self):
+        return token_lengths(self.texts, self.max_len)
+
+class TextInterviewDataset(Dataset):
+    """Untokenized rows; TokenizingCollator encodes each batch in one fast-tokenizer call."""
+    def __init__(self, df, max_len=MAX_LEN):
+        self.max_len = max_len
+        self.texts = df["response"].astype(str).tolist()
+        features = feature_arrays(df)
+        self.ages, self.sexes, self.labels = features["age"], features["sex"], features["label"]
+
+    def __getitem__(self, idx):
+        return self.texts[idx], self.ages[idx], self.sexes[idx], self.labels[idx]
+
+    def __len__(self):
+        return len(self.texts)
+
+    def lengths(self):
+        return token_lengths(self.texts, self.max_len)
+
+class TokenizingCollator:
+    """Batch-level encoding, padded to the longest row in the batch."""
+    def __init__(self, max_length=MAX_LEN):
+        self.max_length = max_length
+
+    def __call__(self, batch):
+        texts, ages, sexes, labels = zip(*batch)
+        encoding = get_tokenizer()(
+            list(texts),
+            truncation=True,
+            padding=True,
+            max_length=self.max_length,
+            return_tensors="pt"
+        )
+        return {
+            "input_ids": encoding["input_ids"],
+            "attention_mask": encoding["attention_mask"],
+            "age": torch.tensor(ages).unsqueeze(1),
+            "sex": torch.tensor(sexes).unsqueeze(1),
+            "label": torch.tensor(labels).unsqueeze(1)
+        }
 
-def train():
-    df = pd.read_csv("your_training_data.csv")  # ensure this exists
-    train_df, val_df = train_test_split(df, test_size=0.2)
+def make_loader(dataset, batch_size=16, shuffle=False, bucket_by_length=False, num_workers=0, prefetch_factor=2,
+                distributed=False, seed=0):
+    """DataLoader with dynamic padding, optional length bucketing and distributed sharding."""
+    streaming = isinstance(dataset, IterableDataset)
+    text_rows = isinstance(dataset, (TextInterviewDataset, StreamingTranscriptDataset))
+    collate_fn = TokenizingCollator(dataset.max_len) if text_rows else collate_batch
+    kwargs = {"collate_fn": collate_fn, "num_workers": num_workers, "pin_memory": torch.cuda.is_available()}
+    if num_workers > 0:
+        # Tokenizer threads inside forked workers just contend with each other
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+        # Persistent workers would keep a stale copy of a streaming dataset's epoch
+        kwargs.update(persistent_workers=not streaming, prefetch_factor=prefetch_factor)
 
-    train_loader = DataLoader(InterviewDataset(train_df), batch_size=16)
-    val_loader = DataLoader(InterviewDataset(val_df), batch_size=16)
+    if streaming:
+        return DataLoader(dataset, batch_size=batch_size, **kwargs)
 
-    model = ADHDClassifier()
-    model.to("cuda" if torch.cuda.is_available() else "cpu")
+    if bucket_by_length:
+        shards = {"num_replicas": dist.get_world_size(), "rank": dist.get_rank()} if distributed else {}
+        sampler = LengthBucketSampler(dataset.lengths(), batch_size, shuffle=shuffle, seed=seed, **shards)
+        return DataLoader(dataset, batch_sampler=sampler, **kwargs)
+    if distributed:
+        sampler = DistributedSampler(dataset, shuffle=shuffle, seed=seed)
+        return DataLoader(dataset, batch_size=batch_size, sampler=sampler, **kwargs)
+    return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle, **kwargs)
 
-    optimizer = torch.optim.AdamW(model.parameters(), lr=2e-5)
+def load_datasets(csv_path, pipeline="cache", seed=None, max_len=MAX_LEN):
+    """Train/val datasets of csv_path for the given --pipeline, truncated to max_len tokens."""
+    if pipeline == "stream":
+        return (StreamingTranscriptDataset(csv_path, "train", seed=seed or 0, max_len=max_len),
+                StreamingTranscriptDataset(csv_path, "val", shuffle_buffer=0, max_len=max_len, shard_ranks=False))
+    if pipeline == "cache":
+        cache_path = build_token_cache(csv_path, max_len=max_len)
+        rows = np.arange(len(CachedTokenDataset(cache_path)))
+        train_idx, val_idx = train_test_split(rows, test_size=0.2, random_state=seed)
+        return CachedTokenDataset(cache_path, train_idx), CachedTokenDataset(cache_path, val_idx)
+
+    df = labelled_transcripts(read_transcripts(csv_path), csv_path)
+    train_df, val_df = train_test_split(df, test_size=0.2, random_state=seed)
+    if pipeline == "fast":
+        return TextInterviewDataset(train_df, max_len), TextInterviewDataset(val_df, max_len)
+    return InterviewDataset(train_df, max_len), InterviewDataset(val_df, max_len)
+
+def measure_loader_throughput(loader, epochs=1):
+    """Iterate the loader without the model, to tell a slow data path from a slow model."""
+    samples = 0
+    start = time.perf_counter()
+    for _ in range(epochs):
+        for batch in loader:
+            samples += batch["label"].size(0)
+    elapsed = time.perf_counter() - start
+    print(f"Data path only: {samples / elapsed:.1f} samples/s ({samples} samples in {elapsed:.2f}s)")
+    return samples / elapsed
+
+# Distributed training: launch with torchrun, which sets RANK / WORLD_SIZE / MASTER_ADDR, e.g.
+#   one machine:    torchrun --nproc_per_node=4 train_model.py --csv data.csv
+#   several hosts:  torchrun --nnodes=2 --node_rank=0 --nproc_per_node=8 \
+#                       --master_addr=10.0.0.1 --master_port=29500 train_model.py --csv data.csv
+# Processes talk over gloo (CPU-only), so no GPUs are needed.
+def init_distributed():
+    """Join the torchrun process group if there is one; returns (rank, world_size)."""
+    world_size = int(os.environ.get("WORLD_SIZE", "1"))
+    if world_size <= 1:
+        return 0, 1
+    if not dist.is_initialized():
+        dist.init_process_group(backend="gloo")
+    # Split the machine's cores between the processes running on it instead of oversubscribing
+    local_world_size = int(os.environ.get("LOCAL_WORLD_SIZE", world_size))
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // local_world_size))
+    return dist.get_rank(), world_size
+
+def train(csv_path="your_training_data.csv", bucket_by_length=False, pipeline="cache",
+          batch_size=16, num_workers=0, prefetch_factor=2, precision="fp32",
+          save_path="adhd_model.pt", seed=None, accumulation_steps=1, gradient_checkpointing=False,
+          lr=LEARNING_RATE, epochs=3, dropout=DROPOUT, max_len=MAX_LEN, on_epoch_end=None,
+          checkpoint_path=None, resume=False):
+    """Train on csv_path and return {"precision", "epoch_seconds", "peak_memory_mb", "metrics", "pruned"}."""
+    rank, world_size = init_distributed()
+    distributed = world_size > 1
+    if distributed and seed is None:
+        seed = 0  # every rank has to make the same train/val split
+    resume_state = None
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        # Read before splitting: the resumed run must reuse the original train/val split
+        resume_state = read_training_checkpoint(checkpoint_path)
+        saved_seed = resume_state.get("seed")
+        if saved_seed is None and seed is None:
+            raise ValueError(f"{checkpoint_path} has no split seed; pass the original --seed to resume it")
+        if saved_seed is not None and seed is not None and saved_seed != seed:
+            raise ValueError(f"{checkpoint_path} was trained with --seed {saved_seed}, not {seed}")
+        seed = saved_seed if saved_seed is not None else seed
+    elif seed is None:
+        # Recorded in the checkpoint and printed with the saved model, so resume and --evaluate can split the same way
+        seed = random.randrange(2 ** 31)
+    log = print if rank == 0 else (lambda *args, **kwargs: None)
+    log(f"Train/val split seed: {seed}")
+
+    # One process per node builds the token cache first (nodes need not share a filesystem),
+    # so the other ranks on that node find it ready instead of building it alongside
+    local_rank = int(os.environ.get("LOCAL_RANK", rank))
+    if distributed and local_rank != 0:
+        dist.barrier()
+    train_ds, val_ds = load_datasets(csv_path, pipeline, seed, max_len)  # ensure csv_path exists
+    if distributed and local_rank == 0:
+        dist.barrier()
+    streaming = isinstance(train_ds, IterableDataset)
+
+    loader_args = {"batch_size": batch_size, "bucket_by_length": bucket_by_length,
+                   "num_workers": num_workers, "prefetch_factor": prefetch_factor}
+    train_loader = make_loader(train_ds, shuffle=True, distributed=distributed, seed=seed or 0, **loader_args)
+    val_loader = make_loader(val_ds, **loader_args)
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model = ADHDClassifier(gradient_checkpointing=gradient_checkpointing, dropout=dropout)
+    model.to(device)
+    if distributed:
+        model = DistributedDataParallel(model)
+
+    optimizer = torch.optim.AdamW(model.parameters(), lr=lr)
+    start_epoch = 0
+    if resume_state is not None:
+        # Every rank restores the same file, so parameters and RNG streams stay in step
+        start_epoch = load_training_checkpoint(checkpoint_path, model.module if distributed else model, optimizer,
+                                               sampler=train_loader.batch_sampler, state=resume_state)
+        resume_state = None  # don't keep a second copy of the weights alive for the whole run
+        log(f"Resuming from {checkpoint_path} at epoch {start_epoch + 1}")
     loss_fn = nn.BCEWithLogitsLoss()
+    epoch_seconds, epoch_peaks = [], []
+    memory = PeakMemoryMonitor(device)
 
-    for epoch in range(3):
+    metrics, pruned = None, False
+    for epoch in range(start_epoch, epochs):
         model.train()
-        for batch in train_loader:
-            ids = batch["input_ids"]
-            mask = batch["attention_mask"]
-            age = batch["age"]
-            sex = batch["sex"]
-            labels = batch["label"]
+        if isinstance(train_loader.sampler, DistributedSampler):
+            train_loader.sampler.set_epoch(epoch)
+        elif isinstance(train_ds, StreamingTranscriptDataset):
+            train_ds.set_epoch(epoch)
+        data_time = compute_time = loss_sum = 0.0
+        samples = steps = batches = 0
+        optimizer.zero_grad()
+        memory.start()
+        # A stream's length is unknown up front (a trailing partial accumulation group is dropped), and its
+        # ranks can see different batch counts, which DDP's join() absorbs instead of deadlocking
+        num_batches = None if streaming else len(train_loader)
+        uneven = model.join() if distributed and streaming else contextlib.nullcontext()
+        tick = time.perf_counter()
+        with uneven:
+            for i, batch in enumerate(train_loader, start=1):
+                loaded = time.perf_counter()
+                data_time += loaded - tick
+
+                ids = batch["input_ids"]
+                mask = batch["attention_mask"]
+                age = batch["age"]
+                sex = batch["sex"]
+                labels = batch["label"]
+
+                ids, mask, age, sex, labels = [x.to(device, non_blocking=True) for x in (ids, mask, age, sex, labels)]
+
+                step_now = i % accumulation_steps == 0 or i == num_batches
+                # The last group of an epoch can be short; average over the micro-batches it really has
+                group_start = (i - 1) // accumulation_steps * accumulation_steps
+                group_size = accumulation_steps
+                if num_batches is not None:
+                    group_size = min(accumulation_steps, num_batches - group_start)
+                # Under DDP, only all-reduce gradients on the micro-batch that steps the optimizer
+                sync = contextlib.nullcontext() if step_now or not distributed else model.no_sync()
+                with sync:
+                    with autocast_context(device, precision):
+                        outputs = model(ids, mask, age, sex).view(-1)
+                        loss = loss_fn(outputs.float(), labels.view(-1))
+                    (loss / group_size).backward()
+                if step_now:
+                    optimizer.step()
+                    optimizer.zero_grad()
+                    steps += 1
 
-            ids, mask, age, sex, labels = [x.to("cuda" if torch.cuda.is_available() else "cpu") for x in (ids, mask, age, sex, labels)]
+                tick = time.perf_counter()
+                compute_time += tick - loaded
+                samples += labels.size(0)
+                loss_sum += loss.item()
+                batches += 1
 
-            optimizer.zero_grad()
-            outputs = model(ids, mask, age, sex).squeeze()
-            loss = loss_fn(outputs, labels)
-            loss.backward()
-            optimizer.step()
+        total = data_time + compute_time
+        epoch_peaks.append(memory.stop())
+        if distributed:
+            # Mean loss over all ranks' batches, samples/s of the whole group (bounded by the slowest rank)
+            sums = torch.tensor([loss_sum, batches, samples], dtype=torch.float64)
+            dist.all_reduce(sums)
+            slowest = torch.tensor([total])
+            dist.all_reduce(slowest, op=dist.ReduceOp.MAX)
+            loss_sum, batches, samples = sums.tolist()
+            total = slowest.item()
+        epoch_seconds.append(total)
+        log(f"Epoch {epoch+1} | Loss: {loss_sum / max(batches, 1):.4f} | {total:.1f}s ({precision})"
+            f" | {samples / total:.1f} samples/s | data wait {data_time / total:.0%} of step time"
+            f" | {compute_time / max(steps, 1) * 1000:.0f} ms/optimizer step"
+            f" | peak memory {epoch_peaks[-1]:.0f} MB" + (f" (rank 0 of {world_size})" if distributed else ""))
 
-        print(f"Epoch {epoch+1} | Loss: {loss.item():.4f}")
+        if checkpoint_path and rank == 0:
+            save_training_checkpoint(checkpoint_path, model.module if distributed else model, optimizer, epoch,
+                                     seed=seed, sampler=train_loader.batch_sampler)
 
-    torch.save(model.state_dict(), "adhd_model.pt")
-    print("✅ Model saved to adhd_model.pt")
+        if on_epoch_end is not None:
+            stop = [False]
+            if rank == 0:
+                metrics = evaluate_model(model.module if distributed else model, val_loader, precision)
+                stop = [bool(on_epoch_end(epoch, metrics))]
+            if distributed:
+                dist.broadcast_object_list(stop, src=0)
+            if stop[0]:
+                log(f"Stopping early after epoch {epoch+1}")
+                pruned = True
+                break
+
+    plain_model = model.module if distributed else model
+    if rank == 0:
+        if metrics is None:
+            metrics = evaluate_model(plain_model, val_loader, precision)
+        threshold_report(metrics)
+        if save_path:
+            torch.save(plain_model.state_dict(), save_path)
+            save_weights(plain_model, os.path.splitext(save_path)[0] + ".safetensors")
+            print(f"✅ Model saved to {save_path} (validation split: --seed {seed})")
+    if distributed:
+        synced = [metrics]
+        dist.broadcast_object_list(synced, src=0)
+        metrics = synced[0]
+    return {"precision": precision, "epoch_seconds": epoch_seconds, "peak_memory_mb": max(epoch_peaks, default=0.0),
+            "metrics": metrics, "pruned": pruned}
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train ADHDClassifier on a transcript CSV")
+    parser.add_argument("--csv", default="your_training_data.csv",
+                        help="transcript CSV, or a .parquet table from transcript_ingest.py")
+    parser.add_argument("--pipeline", choices=["cache", "fast", "row", "stream"], default="cache",
+                        help="cache: tokenized once into a memory-mapped token cache; fast: raw text batch-encoded "
+                             "in the collate function; row: per-row tokenization; stream: rows read in chunks "
+                             "from one or more CSV/JSONL files, split by a hash of participant_id")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=0, help="DataLoader worker processes")
+    parser.add_argument("--prefetch", type=int, default=2, help="batches prefetched per worker")
+    parser.add_argument("--bucket", action="store_true", help="group rows of similar length")
+    parser.add_argument("--data-only", action="store_true", help="report data-path throughput and exit")
+    parser.add_argument("--precision", choices=["fp32", "bf16", "both"], default="fp32",
+                        help="bf16 runs forward/backward under CPU bfloat16 autocast with fp32 master weights; "
+                             "'both' trains once per precision on the same split and compares them")
+    parser.add_argument("--accumulation-steps", type=int, default=1,
+                        help="micro-batches per optimizer step (effective batch = batch size x steps)")
+    parser.add_argument("--gradient-checkpointing", action="store_true", help="recompute BERT activations in backward")
+    parser.add_argument("--lr", type=float, default=LEARNING_RATE)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--dropout", type=float, default=DROPOUT)
+    parser.add_argument("--max-len", type=int, default=MAX_LEN, help="truncate responses to this many tokens")
+    parser.add_argument("--checkpoint", default=None,
+                        help="training checkpoint (optimizer, RNG and split seed included) written after every epoch")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from --checkpoint if it exists, on the split seed stored in it")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="train/val split seed (default: random, printed when training starts)")
+    parser.add_argument("--evaluate", metavar="WEIGHTS", default=None,
+                        help="only evaluate saved weights (.pt or .safetensors) on the validation split; "
+                             "needs the --seed the weights were trained with")
+    args = parser.parse_args()
+    if args.evaluate and args.seed is None and args.pipeline != "stream":
+        # Any other split would mostly score rows the model was trained on
+        parser.error("--evaluate needs the training run's --seed to rebuild its validation split")
+
+    if args.data_only:
+        train_ds, _ = load_datasets(args.csv, args.pipeline, max_len=args.max_len)
+        measure_loader_throughput(make_loader(
+            train_ds, batch_size=args.batch_size, shuffle=True, bucket_by_length=args.bucket,
+            num_workers=args.workers, prefetch_factor=args.prefetch
+        ))
+    elif args.evaluate:
+        _, val_ds = load_datasets(args.csv, args.pipeline, args.seed, args.max_len)
+        if args.evaluate.endswith(".safetensors"):
+            model = load_weights(args.evaluate)
+        else:
+            model = ADHDClassifier()
+            model.load_state_dict(torch.load(args.evaluate, map_location="cpu"))
+        model.to(torch.device("cuda" if torch.cuda.is_available() else "cpu"))
+        loader = make_loader(val_ds, batch_size=args.batch_size, bucket_by_length=args.bucket, num_workers=args.workers)
+        threshold_report(evaluate_model(model, loader, "bf16" if args.precision == "bf16" else "fp32"))
+    else:
+        train_args = {"csv_path": args.csv, "bucket_by_length": args.bucket, "pipeline": args.pipeline,
+                      "batch_size": args.batch_size, "num_workers": args.workers, "prefetch_factor": args.prefetch,
+                      "accumulation_steps": args.accumulation_steps,
+                      "gradient_checkpointing": args.gradient_checkpointing,
+                      "lr": args.lr, "epochs": args.epochs, "dropout": args.dropout, "max_len": args.max_len,
+                      "checkpoint_path": args.checkpoint, "resume": args.resume, "seed": args.seed}
+        if args.precision == "both":
+            if args.checkpoint:
+                raise SystemExit("--checkpoint resumes a single run; pick one --precision")
+            precision_report([
+                train(precision=p, save_path=f"adhd_model_{p}.pt", **{**train_args, "seed": args.seed or 0})
+                for p in ("fp32", "bf16")
+            ])
+        else:
+            train(precision=args.precision, **train_args)
+
+    if dist.is_initialized():
+        dist.destroy_process_group()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Ingestion of transcript sources into one normalized training table.
+
+The transcript CSVs disagree on format: cleaned_adhd_transcripts.csv labels
+rows 1/0 with float ages, cumbria_transcripts_cleaned.csv labels them "ADHD"
+with int ages. normalize_transcripts() maps every source onto one schema with
+vectorized pandas operations (label int8 0/1, age float32 years, sex
+"male"/"female", string ids), ingest() concatenates any number of sources,
+drops duplicate answers and writes a compact Parquet table:
+
+    python transcript_ingest.py adhd_NN_data/*transcripts*.csv --out training_table.parquet
+    python train_model.py --csv training_table.parquet
+
+read_transcripts() loads a table or a raw CSV/JSONL (normalized on the fly),
+and feature_arrays() gives the model inputs (age/100, sex flag, label) as
+numpy columns, so datasets index arrays instead of re-deriving them per row.
+"""
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from atomic_write import atomic_file
+
+DATA_DIR = "adhd_NN_data"
+TABLE_PATH = "training_table.parquet"
+POSITIVE_LABELS = {"1", "1.0", "ADHD", "TRUE", "YES"}
+NEGATIVE_LABELS = {"0", "0.0", "CONTROL", "NON-ADHD", "NO ADHD", "FALSE", "NO"}
+SEXES = {"male": "male", "m": "male", "female": "female", "f": "female"}
+
+
+def normalize_labels(labels):
+    """int8 0/1 from any of the label spellings; unknown spellings raise instead of becoming 0."""
+    text = labels.astype("string").str.strip().str.upper()
+    positive, negative = text.isin(POSITIVE_LABELS), text.isin(NEGATIVE_LABELS)
+    unknown = text[~(positive | negative) & text.notna()].unique()
+    if len(unknown):
+        raise ValueError(f"Unrecognised labels: {sorted(map(str, unknown))[:10]}")
+    return positive.astype("int8").where(positive | negative)
+
+
+def normalize_sex(sexes):
+    return sexes.astype("string").str.strip().str.lower().map(SEXES).astype("category")
+
+
+def normalize_transcripts(df, source=None):
+    """
+    One source's rows in the common schema; rows missing a response, label or age are dropped.
+    Any other columns (e.g. extra features) are kept after the schema columns. Files without
+    participant_id/question_id get <NA> ids; files without a label column (unlabelled held-out
+    answers) keep every row, with an all-<NA> label.
+    """
+    def column(name):
+        return df[name] if name in df else pd.Series(pd.NA, index=df.index)
+
+    labelled = "label" in df
+    out = pd.DataFrame({
+        "participant_id": column("participant_id").astype("string").str.strip(),
+        "question_id": column("question_id").astype("string").str.strip(),
+        "response": df["response"].astype("string").str.strip().str.replace(r"\s+", " ", regex=True),
+        "label": normalize_labels(column("label")),
+        "age": pd.to_numeric(column("age"), errors="coerce").astype("float32"),
+        "sex": normalize_sex(column("sex")),
+    })
+    if source is not None:
+        out["source"] = pd.Categorical([source] * len(out))
+    out = out.join(df.drop(columns=[c for c in out.columns if c in df]))
+    out = out.dropna(subset=["response", "label", "age"] if labelled else ["response", "age"])
+    out = out[out["response"] != ""]
+    out["label"] = out["label"].astype("int8" if labelled else "Int8")
+    return out.reset_index(drop=True)
+
+
+def _read_raw(path):
+    if path.endswith((".jsonl", ".json")):
+        return pd.read_json(path, lines=True, dtype={"participant_id": str, "question_id": str})
+    return pd.read_csv(path, dtype={"participant_id": str, "question_id": str})
+
+
+def read_transcripts(paths):
+    """A normalized table (.parquet) or raw transcript files (.csv/.jsonl), as one frame in the common schema."""
+    paths = [paths] if isinstance(paths, str) else list(paths)
+    frames = [
+        pd.read_parquet(path) if path.endswith(".parquet")
+        else normalize_transcripts(_read_raw(path), os.path.basename(path))
+        for path in paths
+    ]
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def labelled_transcripts(df, source="training data"):
+    """Only the rows with a label, for training; raises if there are none (e.g. an unlabelled held-out file)."""
+    labelled = df.dropna(subset=["label"])
+    if labelled.empty:
+        raise ValueError(f"{source} has no labelled rows to train on")
+    return labelled.astype({"label": "int8"}).reset_index(drop=True)
+
+
+def dedupe_transcripts(df):
+    """
+    Drop repeated (participant, question, response) answers, keeping the first; the same answer can
+    come from several exports. Returns (frame, number of duplicated answers with conflicting labels).
+    """
+    key = ["participant_id", "question_id", "response"]
+    conflicts = int((df.groupby(key, dropna=False, observed=True)["label"].nunique() > 1).sum())
+    return df.drop_duplicates(subset=key, keep="first").reset_index(drop=True), conflicts
+
+
+def load_transcript_dir(data_dir=DATA_DIR):
+    """Every *transcripts*.csv in data_dir, normalized and deduplicated (the reports' evaluation set)."""
+    paths = sorted(glob.glob(os.path.join(data_dir, "*transcripts*.csv")))
+    if not paths:
+        raise FileNotFoundError(f"No *transcripts*.csv files in {data_dir}")
+    return dedupe_transcripts(read_transcripts(paths))[0]
+
+
+def feature_arrays(df):
+    """Model inputs as numpy columns: age/100, sex flag (1.0 = male) and label, all float32."""
+    sex = df["sex"].astype("string").str.strip().str.lower()
+    return {
+        "age": pd.to_numeric(df["age"]).to_numpy(dtype=np.float32) / 100.0,
+        "sex": sex.isin(["male", "m"]).to_numpy(dtype=np.float32),
+        "label": normalize_labels(df["label"]).to_numpy(dtype=np.float32, na_value=np.nan),
+    }
+
+
+def ingest(paths, out=TABLE_PATH):
+    """Normalize, concatenate and dedupe the sources, write the Parquet table; returns the frame."""
+    raw_rows = 0
+    frames = []
+    for path in paths:
+        raw = _read_raw(path)
+        raw_rows += len(raw)
+        frames.append(normalize_transcripts(raw, os.path.basename(path)))
+    df = pd.concat(frames, ignore_index=True)
+    df["source"] = df["source"].astype("category")
+    valid_rows = len(df)
+
+    df, conflicts = dedupe_transcripts(df)
+
+    with atomic_file(out) as tmp_path:
+        df.to_parquet(tmp_path, engine="pyarrow", index=False)
+    print(f"✅ {len(paths)} sources, {raw_rows} rows -> {out}: {len(df)} rows "
+          f"({raw_rows - valid_rows} incomplete, {valid_rows - len(df)} duplicates dropped)")
+    if conflicts:
+        print(f"⚠️ {conflicts} duplicated answers had conflicting labels; the first source's label was kept")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="transcript CSV/JSONL files")
+    parser.add_argument("--out", default=TABLE_PATH)
+    args = parser.parse_args()
+
+    df = ingest(args.paths, args.out)
+    counts = df["label"].value_counts()
+    print(f"   labels: {counts.get(1, 0)} ADHD / {counts.get(0, 0)} control | "
+          f"{df['participant_id'].nunique()} participants | "
+          f"{df.memory_usage(deep=True).sum() / 1024:.0f} KB in memory")
+
+
+if __name__ == "__main__":
+    main()